@@ -1,25 +1,31 @@
-import gspread
 import streamlit as st
-from google.oauth2.service_account import Credentials
 from datetime import datetime
 import pandas as pd
+from ledger_mirror import get_ledger_mirror
+from sheets_client import get_helper_sheet
+from trx_ids import allocate_trx_ids, next_trx_id
+from write_journal import journal_rows
 
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
-
-# Load credentials from Streamlit secrets
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
+# Columns of a bulk import file; the required ones match the form's required fields
+IMPORT_REQUIRED = [
+    "TRX type", "TRX category", "Purpose", "Detail", "Payment method", "Liquidated amount",
+    "Supplier/Donor", "Contribution",
+]
+IMPORT_OPTIONAL = [
+    "Project name", "Budget line", "Payment date", "Liquidation date", "Liquidated invoices", "Remarks",
+]
+# Ledger columns bulk import fills in besides the import columns
+IMPORT_FILLED = ["TRX ID", "Request/Direct", "Payment status", "Liquidation status"]
+# Import columns restricted to the Helper tab's dropdown options
+IMPORT_DROPDOWNS = {"TRX type": "TRX type", "TRX category": "TRX category", "Payment method": "Payment method"}
+# Accepted import date formats; Excel date cells are read as the second
+IMPORT_DATE_FORMATS = ["%Y-%m-%d", "%Y-%m-%d %H:%M:%S"]
 
 # Fetch dropdown options from Helper tab
 @st.cache_data(ttl=60)
 def fetch_dropdown_options_vertical():
     try:
-        client = load_credentials()
-        helper_sheet = client.open_by_url(GOOGLE_SHEET_URL).worksheet("Helper")
+        helper_sheet = get_helper_sheet()
         helper_data = helper_sheet.get_all_records()
         
         dropdown_options = {}
@@ -30,32 +36,19 @@ def fetch_dropdown_options_vertical():
         st.error(f"Error fetching dropdown options: {e}")
         return {}
 
-# Generate the next TRX ID
-def generate_trx_id(sheet):
-    try:
-        all_rows = sheet.get_all_records()
-        if all_rows:
-            last_trx_id = all_rows[-1].get("TRX ID", "TRX-0000")
-            next_id_number = int(last_trx_id.split("-")[1]) + 1
-            return f"TRX-{next_id_number:04d}"
-        else:
-            return "TRX-0001"
-    except Exception as e:
-        st.error(f"Error generating TRX ID: {e}")
-        return "TRX-0001"
-
 # Render the Add New Data Page
 def render_add_data():
     st.write("Use this page to add new data to the database dynamically.")
 
     try:
-        # Authenticate and open the Google Sheet
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-
         # Fetch dropdown options
         dropdown_options = fetch_dropdown_options_vertical()
 
+        mode = st.radio("Entry mode:", ["Single entry", "Bulk import"], horizontal=True)
+        if mode == "Bulk import":
+            render_bulk_import(dropdown_options)
+            return
+
         # User input fields
         trx_type = st.selectbox("Select TRX Type:", options=[""] + dropdown_options.get("TRX type", []), help="Select the type of transaction.")
         trx_category = st.selectbox("Select TRX Category:", options=[""] + dropdown_options.get("TRX category", []), help="Select the category.")
@@ -77,7 +70,7 @@ def render_add_data():
                 return
 
             # Auto-generated and default values
-            trx_id = generate_trx_id(sheet)
+            trx_id = next_trx_id()
             request_direct = "Direct payment"
             approval_status = "Issued"
             liquidation_status = "Liquidated"
@@ -119,12 +112,151 @@ def render_add_data():
                 remarks
             ]
 
-            # Append data to Google Sheet
-            sheet.append_row(data_to_add)
+            # Journal the row; it is appended to the Google Sheet in the background
+            journal_rows([data_to_add])
             st.success(f"Data added successfully! TRX ID: {trx_id}")
 
     except Exception as e:
         st.error(f"Error adding data to Google Sheets: {e}")
 
+# Expense amounts are stored negative and income amounts positive
+def signed_amounts(trx_types, amounts):
+    kind = trx_types.str.lower()
+    amounts = amounts.mask(kind == "expense", -amounts.abs())
+    return amounts.mask(kind == "income", amounts.abs())
+
+# Read an uploaded CSV or Excel file with every cell as text
+def read_import_file(uploaded_file):
+    if uploaded_file.name.lower().endswith(".xlsx"):
+        frame = pd.read_excel(uploaded_file, dtype=str, keep_default_na=False)
+    else:
+        frame = pd.read_csv(uploaded_file, dtype=str, keep_default_na=False, skipinitialspace=True)
+    frame = frame.fillna("")
+    # Match headers case-insensitively against the import columns
+    known = {column.lower(): column for column in IMPORT_REQUIRED + IMPORT_OPTIONAL}
+    frame.columns = [known.get(str(column).strip().lower(), str(column).strip()) for column in frame.columns]
+    return frame
+
+# Normalize and validate every row of an import file at once. Returns the
+# valid rows as a DataFrame and an error report with the file row number
+# (the header is row 1) and the problems found in each rejected row.
+def validate_import(frame, dropdown_options):
+    missing_columns = [column for column in IMPORT_REQUIRED if column not in frame.columns]
+    if missing_columns:
+        raise ValueError(f"Missing columns: {', '.join(missing_columns)}")
+
+    data = pd.DataFrame(index=frame.index)
+    for column in IMPORT_REQUIRED + IMPORT_OPTIONAL:
+        data[column] = frame[column].astype(str).str.strip() if column in frame.columns else ""
+    errors = pd.Series("", index=frame.index)
+
+    def reject(mask, message):
+        errors.loc[mask] += message + "; "
+
+    for column in IMPORT_REQUIRED:
+        reject(data[column] == "", f"{column} is required")
+
+    # Dropdown columns take the Helper tab's spelling
+    for column, option_key in IMPORT_DROPDOWNS.items():
+        options = dropdown_options.get(option_key, [])
+        if options:
+            canonical = data[column].str.lower().map({str(option).lower(): option for option in options})
+            reject((data[column] != "") & canonical.isna(), f"Unknown {column}")
+            data[column] = canonical.fillna(data[column])
+
+    # Amounts are whole IQD
+    amounts = pd.to_numeric(data["Liquidated amount"].str.replace(",", ""), errors="coerce")
+    reject((data["Liquidated amount"] != "") & amounts.isna(), "Liquidated amount is not a number")
+    reject(amounts.notna() & (amounts % 1 != 0), "Liquidated amount is not a whole number")
+
+    # Dates default to today; a missing liquidation date follows the payment date.
+    # Only the listed formats are accepted, so 03/04 is never guessed at.
+    today = datetime.today().strftime("%Y-%m-%d")
+    for column in ["Payment date", "Liquidation date"]:
+        dates = pd.Series(pd.NaT, index=data.index, dtype="datetime64[ns]")
+        for date_format in IMPORT_DATE_FORMATS:
+            dates = dates.fillna(pd.to_datetime(data[column], format=date_format, errors="coerce"))
+        reject((data[column] != "") & dates.isna(), f"{column} is not a YYYY-MM-DD date")
+        data[column] = dates.dt.strftime("%Y-%m-%d").fillna("")
+    data["Payment date"] = data["Payment date"].replace("", today)
+    data["Liquidation date"] = data["Liquidation date"].mask(data["Liquidation date"] == "", data["Payment date"])
+
+    data["Liquidated amount"] = signed_amounts(data["TRX type"], amounts)
+    valid = errors == ""
+
+    report = pd.DataFrame({"Row": frame.index[~valid] + 2, "Error": errors[~valid].str.rstrip("; ")})
+    return data[valid], report
+
+# Columns an import writes that the transactions sheet does not have
+def missing_ledger_columns(headers):
+    return [column for column in IMPORT_FILLED + IMPORT_REQUIRED + IMPORT_OPTIONAL if column not in headers]
+
+# Ledger rows for validated import records, filled in like the single-entry
+# form; headers: the sheet's header row, which sets the column order
+def build_import_rows(records, trx_ids, headers):
+    missing = missing_ledger_columns(headers)
+    if missing:
+        raise ValueError(f"The transactions sheet has no column for: {', '.join(missing)}")
+    rows = pd.DataFrame("", index=records.index, columns=headers, dtype=object)
+    for column in IMPORT_REQUIRED + IMPORT_OPTIONAL:
+        rows[column] = records[column]
+    rows["TRX ID"] = trx_ids
+    # Amounts are written as integers, like the form's number input
+    rows["Liquidated amount"] = pd.Series(
+        [int(amount) for amount in records["Liquidated amount"].tolist()], index=records.index, dtype=object,
+    )
+    rows["Request/Direct"] = "Direct payment"
+    rows["Payment status"] = "Issued"
+    rows["Liquidation status"] = "Liquidated"
+    return rows.values.tolist()
+
+# Upload mode: validate a CSV/Excel file and journal every valid row
+def render_bulk_import(dropdown_options):
+    st.write("Upload a CSV or Excel file with one direct transaction per row.")
+    template = pd.DataFrame(columns=IMPORT_REQUIRED + IMPORT_OPTIONAL).to_csv(index=False)
+    st.download_button("Download Template", template, "import_template.csv", "text/csv")
+
+    uploaded_file = st.file_uploader("Import File:", type=["csv", "xlsx"])
+    if uploaded_file is None:
+        return
+
+    try:
+        frame = read_import_file(uploaded_file)
+        records, report = validate_import(frame, dropdown_options)
+    except Exception as e:
+        st.error(f"Could not read the import file: {e}")
+        return
+
+    # Rows are laid out by the sheet's own header row
+    headers = get_ledger_mirror().headers()
+    missing = missing_ledger_columns(headers)
+    if missing:
+        st.error(f"Cannot import: the transactions sheet has no column for {', '.join(missing)}.")
+        return
+
+    col1, col2 = st.columns(2)
+    col1.metric("Valid rows", len(records))
+    col2.metric("Rejected rows", len(report))
+    if not report.empty:
+        st.markdown("<h3 style='color: #1E3A8A;'>Rejected Rows</h3>", unsafe_allow_html=True)
+        st.dataframe(report, use_container_width=True, hide_index=True)
+        st.download_button("Download Error Report", report.to_csv(index=False), "import_errors.csv", "text/csv")
+
+    # An upload is imported once, however often the page reruns
+    imported = st.session_state.setdefault("imported_files", {})
+    if uploaded_file.file_id in imported:
+        first, last = imported[uploaded_file.file_id]
+        st.success(f"Imported as {first} to {last}.")
+        return
+    if records.empty:
+        return
+
+    if st.button(f"Import {len(records)} Valid Rows"):
+        trx_ids = allocate_trx_ids(len(records))
+        # One journal transaction; the flusher appends it in chunked append_rows calls
+        journal_rows(build_import_rows(records, trx_ids, headers))
+        imported[uploaded_file.file_id] = (trx_ids[0], trx_ids[-1])
+        st.success(f"Imported {len(records)} rows as {trx_ids[0]} to {trx_ids[-1]}.")
+
 if __name__ == "__main__":
     render_add_data()
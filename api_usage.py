@@ -0,0 +1,99 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from app_config import SHEETS_READ_QUOTA, SHEETS_WRITE_QUOTA
+from sheets_metrics import CSV_FIELDS, get_sheets_metrics
+
+# How far back the page looks, in minutes
+WINDOWS = {"Last 15 minutes": 15, "Last hour": 60, "Last 24 hours": 1440}
+SLOWEST_COUNT = 20
+
+# Recorded Sheets calls since `since` as a DataFrame
+def fetch_call_log(since):
+    records = get_sheets_metrics().records(since)
+    calls = pd.DataFrame(records, columns=CSV_FIELDS)
+    calls["time"] = pd.to_datetime(calls["time"], unit="s")
+    return calls
+
+# Calls and average/max calls per script run, by page
+def calls_per_render(calls, renders):
+    rendered = calls.dropna(subset=["render"])
+    per_render = rendered.groupby(["page", "render"]).size().groupby("page").agg(["sum", "max"])
+    per_render.columns = ["Calls", "Max per render"]
+    per_render["Renders"] = pd.Series(renders).reindex(per_render.index).fillna(0).astype(int)
+    per_render["Calls per render"] = (per_render["Calls"] / per_render["Renders"].clip(lower=1)).round(2)
+    return per_render.reset_index().rename(columns={"page": "Page"}).sort_values("Calls", ascending=False)
+
+# Count, latency and payload by operation
+def operation_summary(calls):
+    summary = calls.groupby(["op", "kind"]).agg(
+        Calls=("op", "size"),
+        Errors=("error", lambda errors: int((errors != "").sum())),
+        Mean_ms=("latency_ms", "mean"),
+        P95_ms=("latency_ms", lambda latency: latency.quantile(0.95)),
+        Max_ms=("latency_ms", "max"),
+        Bytes=("bytes", "sum"),
+    ).round(1)
+    return summary.reset_index().sort_values("Calls", ascending=False)
+
+# Render the API Usage Page
+def render_api_usage():
+    st.write("Google Sheets API calls made by this server process, by page and operation.")
+
+    try:
+        metrics = get_sheets_metrics()
+
+        # Current minute against the per-minute quotas
+        reads, writes = metrics.recent_counts(60)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Reads in the last minute", f"{reads} / {SHEETS_READ_QUOTA}")
+            st.progress(min(reads / SHEETS_READ_QUOTA, 1.0))
+        with col2:
+            st.metric("Writes in the last minute", f"{writes} / {SHEETS_WRITE_QUOTA}")
+            st.progress(min(writes / SHEETS_WRITE_QUOTA, 1.0))
+
+        window = st.selectbox("Period", list(WINDOWS), index=1)
+        since = time.time() - WINDOWS[window] * 60
+        calls = fetch_call_log(since)
+        if calls.empty:
+            st.info("No Sheets API calls recorded in this period.")
+            return
+
+        import plotly.express as px  # Deferred: only needed once there is data to chart
+
+        # Calls per minute, with the quotas for reference
+        per_minute = (
+            calls.set_index("time").groupby("kind").resample("1min").size().rename("Calls").reset_index()
+        )
+        minute_chart = px.bar(
+            per_minute, x="time", y="Calls", color="kind", barmode="group",
+            title="Calls per Minute", labels={"time": "Minute", "kind": "Kind"},
+            color_discrete_map={"read": "#3B82F6", "write": "#F59E0B"},
+        )
+        minute_chart.add_hline(y=SHEETS_READ_QUOTA, line_dash="dash", line_color="#D32F2F", annotation_text="Read quota")
+        if SHEETS_WRITE_QUOTA != SHEETS_READ_QUOTA:
+            minute_chart.add_hline(y=SHEETS_WRITE_QUOTA, line_dash="dot", line_color="#D32F2F", annotation_text="Write quota")
+        st.plotly_chart(minute_chart, use_container_width=True)
+
+        st.markdown("<h3 style='color: #1E3A8A;'>Calls per Render</h3>", unsafe_allow_html=True)
+        st.dataframe(calls_per_render(calls, metrics.render_counts(since)), use_container_width=True, hide_index=True)
+
+        st.markdown("<h3 style='color: #1E3A8A;'>Operations</h3>", unsafe_allow_html=True)
+        st.dataframe(operation_summary(calls), use_container_width=True, hide_index=True)
+
+        st.markdown("<h3 style='color: #1E3A8A;'>Slowest Calls</h3>", unsafe_allow_html=True)
+        st.dataframe(calls.nlargest(SLOWEST_COUNT, "latency_ms"), use_container_width=True, hide_index=True)
+
+        # Raw call log for offline analysis
+        col3, col4 = st.columns(2)
+        col3.download_button("Download CSV", metrics.to_csv(), "sheets_calls.csv", "text/csv")
+        col4.download_button("Download JSON Lines", metrics.to_jsonl(), "sheets_calls.jsonl", "application/jsonl")
+
+    except Exception as e:
+        st.error(f"Error loading API usage: {e}")
+
+if __name__ == "__main__":
+    render_api_usage()
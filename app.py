@@ -1,5 +1,6 @@
 import streamlit as st
 from layout import apply_styling, render_sidebar, display_page_title
+from sheets_metrics import begin_render
 
 # Set page configuration
 st.set_page_config(
@@ -18,11 +19,13 @@ if "logged_in" not in st.session_state:
 apply_styling()
 
 if not st.session_state["logged_in"]:
+    begin_render("Login")
     from login import render_login
     render_login()
 else:
     # Render the sidebar and get the selected page
     page = render_sidebar()
+    begin_render(page)
 
     # Display page title dynamically
     if page:
@@ -68,3 +71,7 @@ else:
     elif page == "User Profiles":
         from user_profiles import render_user_profiles
         render_user_profiles()
+
+    elif page == "API Usage":
+        from api_usage import render_api_usage
+        render_api_usage()
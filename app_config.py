@@ -0,0 +1,25 @@
+import os
+import tempfile
+
+# Sheets backend: "google" for the live spreadsheet, "fake" for the offline
+# in-memory stand-in in fake_sheets.py
+SHEETS_BACKEND = os.environ.get("FINANCE_SHEETS_BACKEND", "google")
+
+# Fake backend: ledger size and seed, seconds of latency per call, and calls
+# allowed per minute before it answers 429 (0 = unlimited)
+FAKE_LEDGER_ROWS = int(os.environ.get("FINANCE_FAKE_LEDGER_ROWS", "1000"))
+FAKE_SEED = int(os.environ.get("FINANCE_FAKE_SEED", "0"))
+FAKE_LATENCY = float(os.environ.get("FINANCE_FAKE_LATENCY", "0"))
+FAKE_RATE_LIMIT = int(os.environ.get("FINANCE_FAKE_RATE_LIMIT", "0"))
+
+# Sheets API quotas, in requests per minute. The app calls the API as one
+# service account, so the per-user limits apply.
+SHEETS_READ_QUOTA = int(os.environ.get("FINANCE_SHEETS_READ_QUOTA", "60"))
+SHEETS_WRITE_QUOTA = int(os.environ.get("FINANCE_SHEETS_WRITE_QUOTA", "60"))
+
+# Local directory for the ledger mirror and other on-disk state. The fake
+# backend is reseeded on every start, so it gets a fresh directory each time.
+if SHEETS_BACKEND == "fake":
+    CACHE_DIR = os.environ.get("FINANCE_CACHE_DIR") or tempfile.mkdtemp(prefix="finance-fake-")
+else:
+    CACHE_DIR = os.environ.get("FINANCE_CACHE_DIR", ".finance_cache")
@@ -1,96 +1,121 @@
-import gspread
 import streamlit as st
-from google.oauth2.service_account import Credentials
-from datetime import datetime
 import pandas as pd
-import pytz
-
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
-
-# Load credentials from Streamlit secrets
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
-
-# Fetch pending requests with dynamic refresh
-def fetch_pending_requests():
+from ledger_indexes import load_queued_status, load_status_queue
+from ledger_schema import LEDGER_CACHE_TTL, PENDING, ledger_version
+from ledger_transitions import apply_transitions, approval_changes, baghdad_now
+from work_queue import work_queue_page
+
+# Fetch pending requests
+# version: ledger_version(); any write to the ledger gives a new cache entry
+@st.cache_data(ttl=LEDGER_CACHE_TTL)
+def fetch_pending_requests(version):
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-        data = sheet.get_all_records()
-
-        df = pd.DataFrame(data)
-        pending_requests = df[df["Approval Status"].str.lower() == "pending"]
-        return pending_requests
+        # Read by row number from the status index; no scan of the ledger
+        return load_status_queue("Approval Status", PENDING, LEDGER_COLUMNS)
     except Exception as e:
         st.error(f"Error fetching pending requests: {e}")
         return pd.DataFrame()
 
-# Update approval status
-def update_approval(trx_id, status):
+# Fetch pending requests accepted but not yet written to the sheet
+@st.cache_data(ttl=LEDGER_CACHE_TTL)
+def fetch_awaiting_sync(version):
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-        data = sheet.get_all_values()
-        headers = data[0]
-        trx_id_col = headers.index("TRX ID") + 1
-
-        for i, row in enumerate(data):
-            if row[trx_id_col - 1] == trx_id:
-                row_index = i + 1
-                approval_status_col = headers.index("Approval Status") + 1
-                approval_date_col = headers.index("Approval date") + 1
-                payment_status_col = headers.index("Payment status") + 1
-
-                sheet.update_cell(row_index, approval_status_col, status)
-                sheet.update_cell(row_index, approval_date_col, datetime.now(pytz.timezone("Asia/Baghdad")).strftime("%Y-%m-%d %H:%M:%S"))
+        return load_queued_status("Approval Status", PENDING, LEDGER_COLUMNS)
+    except Exception as e:
+        st.error(f"Error fetching queued requests: {e}")
+        return pd.DataFrame()
 
-                if status == "Approved":
-                    sheet.update_cell(row_index, payment_status_col, "Pending")
+# Columns shown in the pending requests table
+REQUEST_COLUMNS = ["TRX ID", "Project name", "Budget line", "Purpose", "Requested Amount", "Request submission date"]
+# Ledger columns this page reads
+LEDGER_COLUMNS = REQUEST_COLUMNS + ["Approval Status"]
 
-                return True
-        return False
+# Update approval status for one or many requests in a single batched write.
+# Returns the TRX IDs updated and those not found in the sheet.
+def update_approvals(trx_ids, status):
+    try:
+        timestamp = baghdad_now()
+        missing = apply_transitions({trx_id: approval_changes(status, timestamp) for trx_id in trx_ids})
+        return [trx_id for trx_id in trx_ids if trx_id not in missing], missing
     except Exception as e:
         st.error(f"Error updating approval status: {e}")
-        return False
+        return [], []
 
 # Render Approver Page
 def render_approver_page():
     st.write("Review and approve or decline funding requests.")
 
+    # Result of the last bulk action, shown after the rerun
+    notice = st.session_state.pop("approver_notice", None)
+    if notice:
+        st.success(notice)
+    warning = st.session_state.pop("approver_warning", None)
+    if warning:
+        st.warning(warning)
 
     try:
-        pending_requests = fetch_pending_requests()
+        version = ledger_version()
+        pending_requests = fetch_pending_requests(version)
+
+        # Not in the sheet yet, so they cannot be approved or declined until
+        # the next sync; shown read-only
+        awaiting_sync = fetch_awaiting_sync(version)
+        if not awaiting_sync.empty:
+            with st.expander(f"Awaiting sync ({len(awaiting_sync)})"):
+                st.caption("These requests are still being written to the sheet and can be reviewed once they appear above.")
+                st.dataframe(
+                    awaiting_sync[REQUEST_COLUMNS],
+                    hide_index=True,
+                    use_container_width=True,
+                    column_config={
+                        "Requested Amount": st.column_config.NumberColumn("Requested Amount", format="%d IQD"),
+                    },
+                )
 
         if pending_requests.empty:
             st.info("No pending requests to review.")
             return
 
-        for index, request in pending_requests.iterrows():
-            with st.expander(f"Request ID: {request['TRX ID']} - {request['Project name']}"):
-                st.write(f"**Budget Line:** {request['Budget line']}")
-                st.write(f"**Purpose:** {request['Purpose']}")
-                st.write(f"**Requested Amount:** {int(request['Requested Amount']):,} IQD")
-                st.write(f"**Submission Date:** {request['Request submission date']}")
-
-                col1, col2 = st.columns(2)
-
-                if col1.button(f"Approve {request['TRX ID']}", key=f"approve_{request['TRX ID']}"):
-                    update_approval(request["TRX ID"], "Approved")
-                    st.success(f"Request {request['TRX ID']} approved.")
-                    st.session_state["refresh_page"] = True
-
-                if col2.button(f"Decline {request['TRX ID']}", key=f"decline_{request['TRX ID']}"):
-                    update_approval(request["TRX ID"], "Declined")
-                    st.warning(f"Request {request['TRX ID']} declined.")
-                    st.session_state["refresh_page"] = True
-
-                if st.session_state.get("refresh_page", False):
-                    st.session_state["refresh_page"] = False
-                    st.rerun()
+        visible_requests = work_queue_page(pending_requests, "approver", sort_by="Request submission date")
+        table = visible_requests[REQUEST_COLUMNS].copy()
+        table.insert(0, "Select", False)
+
+        # A new key after each action or page change resets the checkboxes
+        table_key = (
+            f"approver_table_{st.session_state.get('approver_table_version', 0)}"
+            f"_{st.session_state.get('approver_page', 1)}"
+        )
+        edited = st.data_editor(
+            table,
+            key=table_key,
+            hide_index=True,
+            use_container_width=True,
+            disabled=REQUEST_COLUMNS,
+            column_config={
+                "Select": st.column_config.CheckboxColumn("Select", default=False),
+                "Requested Amount": st.column_config.NumberColumn("Requested Amount", format="%d IQD"),
+            },
+        )
+        selected = edited.loc[edited["Select"], "TRX ID"].tolist()
+
+        col1, col2 = st.columns(2)
+        approve = col1.button(f"Approve selected ({len(selected)})", disabled=not selected, use_container_width=True)
+        decline = col2.button(f"Decline selected ({len(selected)})", disabled=not selected, use_container_width=True)
+
+        if approve or decline:
+            status = "Approved" if approve else "Declined"
+            updated, missing = update_approvals(selected, status)
+            if missing:
+                st.session_state["approver_warning"] = (
+                    f"{len(missing)} request(s) not {status.lower()}, as they were not found in the sheet: "
+                    f"{', '.join(missing)}"
+                )
+            if updated:
+                # The mirror is already patched, so the rerun reads it locally
+                st.session_state["approver_notice"] = f"{len(updated)} request(s) {status.lower()}: {', '.join(updated)}"
+                st.session_state["approver_table_version"] = st.session_state.get("approver_table_version", 0) + 1
+            if updated or missing:
+                st.rerun()
 
     except Exception as e:
         st.error(f"Error loading approver page: {e}")
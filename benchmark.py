@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+# The benchmark always runs against the seeded offline backend
+os.environ["FINANCE_SHEETS_BACKEND"] = "fake"
+os.environ.setdefault("FINANCE_CACHE_DIR", tempfile.mkdtemp(prefix="finance-bench-"))
+import streamlit as st
+import streamlit.logger
+
+import app_config
+import ledger_aggregates
+import ledger_indexes
+import ledger_mirror
+import ledger_schema
+from sheets_client import get_spreadsheet
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+# Kept across runs for comparison (git-ignored), unlike the per-run CACHE_DIR
+RESULTS_PATH = "benchmark_results.jsonl"
+# Slowdown (relative to the previous run) reported as a regression
+REGRESSION_THRESHOLD = 0.2
+BENCH_USER = "requester1@example.org"
+
+# Caches the pages build on top of the mirror; cleared before each cold run
+PAGE_CACHES = [
+    ledger_schema.get_typed_ledger, ledger_schema._typed_snapshot, ledger_indexes.get_status_index,
+    ledger_indexes.get_requester_index, ledger_aggregates.get_ledger_aggregates,
+]
+
+# Streamlit warns about the missing browser session on every call made
+# outside a script run, and resets its log level whenever it loads config
+def quiet_streamlit():
+    streamlit.logger.set_log_level("error")
+
+# A page function without its st.cache_data wrapper, so every call does the work
+def uncached(function):
+    return getattr(function, "__wrapped__", function)
+
+# The first download is the mirror's cold run; later runs are syncs
+def first_download():
+    ledger_mirror.get_ledger_mirror()
+
+def mirror_sync():
+    ledger_mirror.get_ledger_mirror().sync()
+
+def finance_dashboard():
+    from finance_dashboard import fetch_finance_data
+    return fetch_finance_data()
+
+def database_analysis():
+    from database_analyze import fetch_data
+    return uncached(fetch_data)("Month", 3, ledger_schema.ledger_version())
+
+def approver_queue():
+    from approver_page import fetch_awaiting_sync, fetch_pending_requests
+    version = ledger_schema.ledger_version()
+    return uncached(fetch_pending_requests)(version), uncached(fetch_awaiting_sync)(version)
+
+def payment_queue():
+    from payment_page import fetch_pending_payments
+    return uncached(fetch_pending_payments)(ledger_schema.ledger_version())
+
+def liquidation_queue():
+    from liquidation_page import fetch_pending_liquidations
+    return uncached(fetch_pending_liquidations)(ledger_schema.ledger_version())
+
+def past_requests():
+    from past_requests import fetch_past_requests
+    return uncached(fetch_past_requests)(ledger_schema.ledger_version())
+
+def user_requests():
+    from view_requests import fetch_user_requests
+    return fetch_user_requests(BENCH_USER)
+
+def database_page():
+    from database import count_database_rows, fetch_database_page, fetch_trx_type_counts
+    return fetch_database_page(None, {}, None, False, 50, 1), count_database_rows({}), fetch_trx_type_counts()
+
+# Each page's fetch and transform functions, called directly rather than
+# through a Streamlit render, in the order a user would open the pages. The
+# mirror benchmark is the initial download every other page depends on.
+BENCHMARKS = {
+    "mirror_sync": mirror_sync,
+    "finance_dashboard": finance_dashboard,
+    "database_analysis": database_analysis,
+    "approver_queue": approver_queue,
+    "payment_queue": payment_queue,
+    "liquidation_queue": liquidation_queue,
+    "past_requests": past_requests,
+    "user_requests": user_requests,
+    "database_page": database_page,
+}
+
+# Fresh fake spreadsheet with `rows` ledger rows, an empty mirror and no cached results
+def reset_backend(rows, run):
+    quiet_streamlit()
+    app_config.FAKE_LEDGER_ROWS = rows
+    ledger_mirror.MIRROR_PATH = os.path.join(app_config.CACHE_DIR, f"bench_{rows}_{run}.sqlite")
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    return get_spreadsheet()
+
+def clear_page_caches():
+    for cache in PAGE_CACHES:
+        cache.clear()
+
+# The function to time cold; page caches are cleared first, untimed
+def cold_run(name):
+    if name == "mirror_sync":
+        return first_download
+    clear_page_caches()
+    return BENCHMARKS[name]
+
+def _sheet_calls(spreadsheet):
+    return sum(spreadsheet.calls.values())
+
+# One workflow write: a status change patched into the mirror, or for the
+# mirror benchmark a row appended in the sheet for the next sync to fetch
+def make_change(name, spreadsheet, rows, step):
+    if name == "mirror_sync":
+        sheet = spreadsheet.sheet1
+        sheet.append_rows([[f"TRX-BENCH-{step}"] + [""] * (len(sheet.row_values(1)) - 1)])
+        return
+    status = ledger_schema.APPROVED if step % 2 else ledger_schema.PENDING
+    ledger_mirror.get_ledger_mirror().patch_rows({2 + rows // 2: {"Approval Status": status}})
+
+def timed(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+# Per benchmark: cold time (empty page caches; for the mirror, the first
+# download) and Sheets calls, warm time (second call), and the time after one
+# workflow write (the incremental path). Then the cold peak memory of the
+# calls themselves on a second backend, as tracemalloc slows the timed run.
+def run_size(rows, names):
+    results = {name: {"rows": rows, "benchmark": name} for name in names}
+
+    spreadsheet = reset_backend(rows, "time")
+    for step, name in enumerate(names):
+        cold = cold_run(name)
+        calls = _sheet_calls(spreadsheet)
+        results[name]["cold_s"] = timed(cold)
+        results[name]["sheet_calls"] = _sheet_calls(spreadsheet) - calls
+        results[name]["warm_s"] = timed(BENCHMARKS[name])
+        make_change(name, spreadsheet, rows, step)
+        results[name]["changed_s"] = timed(BENCHMARKS[name])
+
+    reset_backend(rows, "memory")
+    for name in names:
+        cold = cold_run(name)
+        tracemalloc.start()
+        cold()
+        results[name]["peak_mib"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+    return list(results.values())
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+# Latest stored result per (rows, benchmark)
+def load_previous(path):
+    previous = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    previous[(record["rows"], record["benchmark"])] = record
+    return previous
+
+def save_results(path, results):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in results:
+            f.write(json.dumps(record) + "\n")
+
+def _change(current, before):
+    if not before:
+        return ""
+    change = (current - before) / before
+    flag = "  REGRESSION" if change > REGRESSION_THRESHOLD else ""
+    return f"{change:+7.1%}{flag}"
+
+def print_results(results, previous):
+    print(
+        f"{'rows':>8}  {'benchmark':<18} {'cold s':>8} {'warm s':>8} {'changed s':>9} {'peak MiB':>9} {'calls':>6}"
+        "  vs previous (cold)"
+    )
+    for record in results:
+        before = previous.get((record["rows"], record["benchmark"]), {})
+        print(
+            f"{record['rows']:>8,}  {record['benchmark']:<18} {record['cold_s']:>8.3f} {record['warm_s']:>8.3f} "
+            f"{record.get('changed_s', 0):>9.3f} {record['peak_mib']:>9.1f} {record['sheet_calls']:>6}  "
+            f"{_change(record['cold_s'], before.get('cold_s'))}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each page's data path against the fake Sheets backend.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_SIZES, help="ledger sizes to run")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument("--results", default=RESULTS_PATH, help="JSON Lines file the results are appended to")
+    parser.add_argument("--no-save", action="store_true", help="compare with the previous run without storing this one")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if not args.only or name in args.only or name == "mirror_sync"]
+
+    revision = git_revision()
+    run_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    results = []
+    for rows in args.rows:
+        for record in run_size(rows, names):
+            record.update({"revision": revision, "run_at": run_at, "python": sys.version.split()[0]})
+            results.append(record)
+
+    print_results(results, load_previous(args.results))
+    if not args.no_save:
+        save_results(args.results, results)
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,85 @@
 import streamlit as st
-import gspread
 import pandas as pd
-import plotly.express as px
-from google.oauth2.service_account import Credentials
+from ledger_mirror import get_ledger_mirror
+from ledger_schema import normalize_labels, type_ledger
 
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
+PAGE_SIZES = [25, 50, 100, 250]
 
-# Load credentials from Streamlit secrets
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
+# Fetch one page of the database; projection, filter and sort run in the local mirror
+def fetch_database_page(columns, filters, sort_by, descending, page_size, page):
+    try:
+        df = get_ledger_mirror().query_page(
+            columns, filters, sort_by, descending, limit=page_size, offset=(page - 1) * page_size
+        )
+        # Only the visible rows are typed
+        return type_ledger(df)
+    except Exception as e:
+        st.error(f"Error loading the database: {e}")
+        return pd.DataFrame()
 
-# Fetch finance data from Google Sheets
-@st.cache_data(ttl=300)
-def fetch_database():
+# Number of rows matching the filters
+def count_database_rows(filters):
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
+        return get_ledger_mirror().count(filters)
+    except Exception as e:
+        st.error(f"Error loading the database: {e}")
+        return 0
 
-        # Ensure numeric conversion for necessary columns
-        df["Liquidated amount"] = pd.to_numeric(df["Liquidated amount"], errors="coerce").fillna(0)
-        return df
+# Count transactions per type without loading the ledger
+def fetch_trx_type_counts():
+    try:
+        counts = get_ledger_mirror().value_counts("TRX type")
+        labels = normalize_labels(counts.index.to_series()).astype(str)
+        return counts.groupby(labels.to_numpy()).sum()
     except Exception as e:
         st.error(f"Error loading the database: {e}")
-        return pd.DataFrame()
+        return pd.Series(dtype="int64")
 
 # Render the Database Page
 def render_database():
-
-    # Fetch database data
-    df = fetch_database()
-    if df.empty:
+    headers = get_ledger_mirror().headers()
+    if not headers:
         st.warning("No data available in the database.")
         return
 
-    # Display the database in a styled table
     st.markdown("<h3 style='color: #1E3A8A;'>Full Database Overview</h3>", unsafe_allow_html=True)
-    st.dataframe(
-        df.style.set_properties(
-            **{
-                "background-color": "#F3F4F6",
-                "color": "#1E3A8A",
-                "border-color": "#D1D5DB",
-            }
-        ).set_table_styles(
-            [{"selector": "th", "props": [("background-color", "#1E3A8A"), ("color", "white")]}]
-        ),
-        height=600,
-        use_container_width=True,
+
+    # Grid controls
+    with st.expander("Columns, filter and sort"):
+        columns = st.multiselect("Columns", headers, default=headers, key="db_columns")
+        col1, col2 = st.columns(2)
+        filter_column = col1.selectbox("Filter column", headers, key="db_filter_column")
+        filter_text = col2.text_input("Contains", key="db_filter_text")
+        col3, col4 = st.columns(2)
+        sort_by = col3.selectbox("Sort by", ["Sheet order"] + headers, key="db_sort_by")
+        descending = col4.radio("Order", ["Ascending", "Descending"], horizontal=True, key="db_order") == "Descending"
+
+    filters = {filter_column: filter_text.strip()} if filter_text.strip() else {}
+    total = count_database_rows(filters)
+
+    # Pager; keep the current page inside the range when the filter shrinks it
+    col5, col6, col7 = st.columns([1, 1, 2])
+    page_size = col5.selectbox("Rows per page", PAGE_SIZES, index=1, key="db_page_size")
+    page_count = max(1, -(-total // page_size))
+    if st.session_state.get("db_page", 1) > page_count:
+        st.session_state["db_page"] = page_count
+    page = col6.number_input("Page", min_value=1, max_value=page_count, step=1, key="db_page")
+
+    df = fetch_database_page(
+        columns or headers, filters, None if sort_by == "Sheet order" else sort_by, descending, page_size, page
     )
+    first_row = (page - 1) * page_size + 1 if total else 0
+    col7.caption(f"Rows {first_row:,}-{min(page * page_size, total):,} of {total:,}")
+
+    st.dataframe(df, height=600, use_container_width=True, hide_index=True)
 
     # Add a data visualization section
     st.markdown("<h3 style='color: #1E3A8A;'>Visualization</h3>", unsafe_allow_html=True)
-    trx_type_count = df["TRX type"].value_counts().reset_index()
+    trx_type_count = fetch_trx_type_counts().reset_index()
     trx_type_count.columns = ["TRX Type", "Count"]
 
+    import plotly.express as px  # Deferred: only needed once there is data to chart
+
     trx_type_chart = px.bar(
         trx_type_count,
         x="TRX Type",
@@ -1,69 +1,52 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from google.oauth2.service_account import Credentials
-import gspread
+from funds_timeseries import GRANULARITIES, funds_timeseries, period_labels
+from ledger_schema import LEDGER_CACHE_TTL, ledger_version, load_typed_ledger
 
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
+# Ledger columns this page reads (funds_timeseries defaults)
+LEDGER_COLUMNS = ["Liquidation date", "Liquidated amount"]
 
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
-
-# Fetch and process database
-@st.cache_data(ttl=300)
-def fetch_data():
+# Fetch the funds time series for the selected granularity
+# version: ledger_version(); any write to the ledger gives a new cache entry
+@st.cache_data(ttl=LEDGER_CACHE_TTL)
+def fetch_data(granularity, window, version):
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
-
-        # Convert liquidation date column to datetime and extract month-year
-        df["Liquidation date"] = pd.to_datetime(df["Liquidation date"], errors='coerce')
-        df["Month"] = df["Liquidation date"].dt.strftime('%Y-%m')
-
-        # Convert liquidated amount to numeric and handle errors
-        df["Liquidated amount"] = pd.to_numeric(df["Liquidated amount"], errors='coerce').fillna(0)
-
-        return df
+        return funds_timeseries(load_typed_ledger(LEDGER_COLUMNS), granularity, window)
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
 
 # Render database analysis page
 def render_database_analysis():
-    st.write("Analyze the monthly income and expenses trends using a waterfall chart.")
+    st.write("Analyze the income and expenses trends using a waterfall chart.")
+
+    col1, col2 = st.columns([3, 1])
+    granularity = col1.radio("Granularity", list(GRANULARITIES), index=2, horizontal=True)
+    window = col2.number_input("Rolling window (periods)", min_value=1, max_value=24, value=3)
 
-    df = fetch_data()
+    timeseries = fetch_data(granularity, int(window), ledger_version())
 
-    if df.empty:
+    if timeseries.empty:
         st.warning("No data available for analysis.")
         return
 
-    # Group data by month, summing the already signed amounts (positive for income, negative for expense)
-    monthly_summary = df.groupby("Month")["Liquidated amount"].sum().reset_index()
-
-    # Sort months chronologically
-    monthly_summary = monthly_summary.sort_values("Month")
+    import plotly.graph_objects as go  # Deferred: only needed once there is data to chart
 
-    # Extract month names and values
-    months = monthly_summary["Month"].tolist()
-    values = monthly_summary["Liquidated amount"].tolist()
-
-    # Waterfall chart - show cumulative effect month by month
-    cumulative_values = [sum(values[:i+1]) for i in range(len(values))]
+    # Periods with transactions, in chronological order; the amounts are
+    # already signed (positive for income, negative for expense)
+    active = timeseries[timeseries["Net flow"] != 0]
+    periods = period_labels(active.index)
+    values = active["Net flow"].tolist()
+    total = timeseries["Cumulative"].iloc[-1]
 
+    # Waterfall chart - show cumulative effect period by period
     waterfall_fig = go.Figure(go.Waterfall(
         name="Funds Flow",
         orientation="v",
         measure=["relative"] * len(values) + ["total"],
-        x=months + ["Total"],
-        y=values + [sum(values)],  # Add total to the end
-        text=[f"{val:,.0f} IQD" for val in values] + [f"{sum(values):,.0f} IQD"],
+        x=periods + ["Total"],
+        y=values + [total],  # Add total to the end
+        text=[f"{val:,.0f} IQD" for val in values] + [f"{total:,.0f} IQD"],
         textposition="outside",
         decreasing=dict(marker=dict(color="red")),
         increasing=dict(marker=dict(color="green")),
@@ -72,13 +55,28 @@ def render_database_analysis():
     ))
 
     waterfall_fig.update_layout(
-        title="Monthly Funds Flow",
-        xaxis_title="Month",
+        title=f"Funds Flow by {granularity}",
+        xaxis_title=granularity,
         yaxis_title="Net Income (IQD)",
         showlegend=False
     )
 
     st.plotly_chart(waterfall_fig, use_container_width=True)
 
+    # Trend chart - running balance and rolling average of the net flow
+    labels = period_labels(timeseries.index)
+    trend_fig = go.Figure()
+    trend_fig.add_trace(go.Scatter(x=labels, y=timeseries["Cumulative"], name="Cumulative Funds", line=dict(color="#1E3A8A")))
+    trend_fig.add_trace(go.Scatter(
+        x=labels, y=timeseries["Rolling average"], name=f"{window}-period Average Flow", line=dict(color="#F59E0B", dash="dash")
+    ))
+    trend_fig.update_layout(
+        title="Funds Trend",
+        xaxis_title=granularity,
+        yaxis_title="IQD",
+    )
+
+    st.plotly_chart(trend_fig, use_container_width=True)
+
 if __name__ == "__main__":
     render_database_analysis()
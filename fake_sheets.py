@@ -0,0 +1,406 @@
+import hashlib
+import random
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range, numericise_all, rowcol_to_a1
+
+# Offline stand-in for the Google Sheets backend, selected with
+# FINANCE_SHEETS_BACKEND=fake. It implements the subset of the gspread client,
+# spreadsheet and worksheet API the app uses, keeps every tab in memory, and
+# can add per-call latency and answer 429 once a per-minute quota is used up.
+
+LEDGER_HEADERS = [
+    "TRX ID", "TRX type", "TRX category", "Request/Direct", "Requester name", "Project name",
+    "Budget line", "Purpose", "Detail", "Requested Amount", "Request submission date",
+    "Approval Status", "Approval date", "Payment status", "Payment date", "Payment method",
+    "Liquidation status", "Liquidated amount", "Liquidation date", "Liquidated invoices",
+    "Returned amount", "Related request ID", "Supplier/Donor", "Contribution", "Remarks",
+]
+USERS_HEADERS = ["Name", "Email", "Phone Number", "Password", "Role"]
+
+PROJECTS = ["Clean Rivers", "Green Schools", "Solar Villages", "Tree Planting", "Climate Education"]
+PAYMENT_METHODS = {"Cash": 50, "Bank transfer": 35, "Cheque": 15}
+EXPENSE_CATEGORIES = ["Project expense", "Operational expense", "Salaries"]
+INCOME_CATEGORIES = ["Grant", "Donation"]
+DONORS = ["Green Fund", "Climate Trust", "Local Council", "Private donor"]
+
+# Password of every seeded user
+DEMO_PASSWORD = "demo"
+DEMO_USERS = [
+    ("Admin User", "admin@example.org", "Admin"),
+    ("Approver User", "approver@example.org", "Approver"),
+    ("Requester One", "requester1@example.org", "Requester"),
+    ("Requester Two", "requester2@example.org", "Requester"),
+    ("Requester Three", "requester3@example.org", "Requester"),
+]
+
+# Google counts the read and write quotas per minute
+RATE_WINDOW = 60
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def _timestamp(moment):
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+# Whole IQD amount, rounded to the nearest thousand
+def _amount(rng, median):
+    return max(1000, int(round(rng.lognormvariate(0, 0.8) * median, -3)))
+
+# Synthetic transactions with the workflow mix seen in production: mostly
+# request-based expenses spread over every approval, payment and liquidation
+# stage, plus directly entered income. Returns the sheet values, header first.
+def synthetic_ledger(rows, seed=0, requesters=None, end=None):
+    rng = random.Random(seed)
+    requesters = requesters or [email for _, email, role in DEMO_USERS if role == "Requester"]
+    end = end or datetime(2025, 12, 31, 18, 0, 0)
+    start = end - timedelta(days=730)
+    methods, weights = list(PAYMENT_METHODS), list(PAYMENT_METHODS.values())
+
+    values = [list(LEDGER_HEADERS)]
+    for number in range(1, rows + 1):
+        row = dict.fromkeys(LEDGER_HEADERS, "")
+        row["TRX ID"] = f"TRX-{number:04d}"
+        row["Project name"] = rng.choice(PROJECTS)
+        row["Payment method"] = rng.choices(methods, weights)[0]
+        submitted = start + timedelta(seconds=rng.randrange(int((end - start).total_seconds())))
+
+        if rng.random() < 0.2:
+            # Income entered on the Add Data page
+            day = submitted.strftime("%Y-%m-%d")
+            row.update({
+                "TRX type": "Income",
+                "TRX category": rng.choice(INCOME_CATEGORIES),
+                "Request/Direct": "Direct payment",
+                "Purpose": "Funding received",
+                "Detail": "Synthetic income",
+                "Payment status": "Issued",
+                "Payment date": day,
+                "Liquidation status": "Liquidated",
+                "Liquidated amount": _amount(rng, 5_000_000),
+                "Liquidation date": day,
+                "Supplier/Donor": rng.choice(DONORS),
+                "Contribution": "Cash",
+            })
+        else:
+            requested = -_amount(rng, 400_000)
+            row.update({
+                "TRX type": "Expense",
+                "TRX category": rng.choice(EXPENSE_CATEGORIES),
+                "Request/Direct": "Request based",
+                "Requester name": rng.choice(requesters),
+                "Budget line": f"BL-{rng.randint(1, 40):02d}",
+                "Purpose": "Project activity",
+                "Detail": "Synthetic request",
+                "Requested Amount": requested,
+                "Request submission date": _timestamp(submitted),
+                "Approval Status": "Pending",
+            })
+            stage = rng.random()
+            approved = submitted + timedelta(hours=rng.randint(1, 72))
+            paid = approved + timedelta(hours=rng.randint(1, 120))
+            liquidated = paid + timedelta(days=rng.randint(1, 30))
+            if stage >= 0.1:
+                declined = stage < 0.2
+                row["Approval Status"] = "Declined" if declined else "Approved"
+                row["Approval date"] = _timestamp(approved)
+                if not declined:
+                    row["Payment status"] = "Pending"
+            if stage >= 0.3:
+                row.update({
+                    "Payment status": "Issued",
+                    "Payment date": _timestamp(paid),
+                    "Liquidation status": "To be liquidated",
+                })
+            if stage >= 0.5:
+                spent = -int(round(-requested * rng.uniform(0.8, 1.0), -3))
+                row.update({
+                    "Liquidation status": "Liquidated",
+                    "Liquidated amount": spent,
+                    "Liquidation date": _timestamp(liquidated),
+                    "Liquidated invoices": f"https://example.org/invoices/{number}",
+                    "Returned amount": spent - requested,
+                })
+        values.append([str(row[header]) for header in LEDGER_HEADERS])
+    return values
+
+# Users tab; every account signs in with DEMO_PASSWORD
+def synthetic_users():
+    password = hashlib.sha256(DEMO_PASSWORD.encode()).hexdigest()
+    values = [list(USERS_HEADERS)]
+    for index, (name, email, role) in enumerate(DEMO_USERS):
+        values.append([name, email, f"0750000000{index}", password, role])
+    return values
+
+# Helper tab: one dropdown list per column, of different lengths
+def synthetic_helper():
+    columns = {
+        "Project name": PROJECTS,
+        "Payment method": list(PAYMENT_METHODS),
+        "TRX type": ["Income", "Expense"],
+        "TRX category": EXPENSE_CATEGORIES + INCOME_CATEGORIES,
+    }
+    depth = max(len(options) for options in columns.values())
+    values = [list(columns)]
+    for index in range(depth):
+        values.append([options[index] if index < len(options) else "" for options in columns.values()])
+    return values
+
+
+# Just enough of a requests.Response for gspread's APIError
+class _FakeResponse:
+    def __init__(self, code, message, status):
+        self.status_code = code
+        self.text = message
+        self._error = {"error": {"code": code, "message": message, "status": status}}
+
+    def json(self):
+        return self._error
+
+
+def _trim(rows):
+    rows = [list(row) for row in rows]
+    for row in rows:
+        while row and row[-1] == "":
+            row.pop()
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, values, index):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = index
+        self.index = index
+        self._values = [[str(value) for value in row] for row in values]
+
+    @property
+    def spreadsheet_id(self):
+        return self.spreadsheet.id
+
+    @property
+    def row_count(self):
+        return len(self._values)
+
+    @property
+    def col_count(self):
+        return max((len(row) for row in self._values), default=0)
+
+    def _padded(self):
+        width = self.col_count
+        return [row + [""] * (width - len(row)) for row in self._values]
+
+    def _grid(self, range_name):
+        grid = a1_range_to_grid_range(range_name.split("!")[-1])
+        row_start = grid.get("startRowIndex", 0)
+        row_end = grid.get("endRowIndex", len(self._values))
+        col_start = grid.get("startColumnIndex", 0)
+        col_end = grid.get("endColumnIndex", self.col_count)
+        return row_start, row_end, col_start, col_end
+
+    def _read(self, range_name):
+        row_start, row_end, col_start, col_end = self._grid(range_name)
+        return _trim(row[col_start:col_end] for row in self._values[row_start:row_end])
+
+    def _write(self, row, col, value):
+        while len(self._values) < row:
+            self._values.append([])
+        cells = self._values[row - 1]
+        while len(cells) < col:
+            cells.append("")
+        cells[col - 1] = str(value)
+
+    def get_all_values(self, *args, **kwargs):
+        with self.spreadsheet._call("get_all_values"):
+            return self._padded()
+
+    def get_all_records(self, head=1, default_blank="", numericise_ignore=(), **kwargs):
+        with self.spreadsheet._call("get_all_records"):
+            values = self._padded()
+        if len(values) < head:
+            return []
+        headers = values[head - 1]
+        ignore = [] if "all" in numericise_ignore else [index - 1 for index in numericise_ignore]
+        return [
+            dict(zip(headers, numericise_all(row, default_blank=default_blank, ignore=ignore)))
+            for row in values[head:]
+        ]
+
+    def get(self, range_name=None, **kwargs):
+        with self.spreadsheet._call("get"):
+            return self._read(range_name) if range_name else _trim(self._values)
+
+    def batch_get(self, ranges, **kwargs):
+        with self.spreadsheet._call("batch_get"):
+            return [self._read(range_name) for range_name in ranges]
+
+    def row_values(self, row, **kwargs):
+        with self.spreadsheet._call("row_values"):
+            return _trim([self._values[row - 1]])[0] if row <= len(self._values) else []
+
+    def col_values(self, col, **kwargs):
+        with self.spreadsheet._call("col_values"):
+            column = [[row[col - 1] if col <= len(row) else ""] for row in self._values]
+            return [cells[0] if cells else "" for cells in _trim(column)]
+
+    def update_cell(self, row, col, value):
+        with self.spreadsheet._call("update_cell", write=True):
+            self._write(row, col, value)
+            return {"updatedRange": f"{self.title}!{rowcol_to_a1(row, col)}", "updatedCells": 1}
+
+    def batch_update(self, data, **kwargs):
+        with self.spreadsheet._call("batch_update", write=True):
+            cells = 0
+            for update in data:
+                row_start, _, col_start, _ = self._grid(update["range"])
+                for row_offset, row in enumerate(update["values"]):
+                    for col_offset, value in enumerate(row):
+                        self._write(row_start + row_offset + 1, col_start + col_offset + 1, value)
+                        cells += 1
+            return {"totalUpdatedCells": cells}
+
+    def append_row(self, values, **kwargs):
+        return self.append_rows([values], _op="append_row")
+
+    # Rows go after the last non-empty row, as the Sheets append endpoint does
+    def append_rows(self, values, _op="append_rows", **kwargs):
+        with self.spreadsheet._call(_op, write=True):
+            while self._values and not any(self._values[-1]):
+                self._values.pop()
+            first_row = len(self._values) + 1
+            for row in values:
+                self._values.append([str(value) for value in row])
+            width = max((len(row) for row in values), default=1)
+            last_cell = rowcol_to_a1(first_row + len(values) - 1, width)
+            return {
+                "spreadsheetId": self.spreadsheet.id,
+                "updates": {
+                    "spreadsheetId": self.spreadsheet.id,
+                    "updatedRange": f"{self.title}!A{first_row}:{last_cell}",
+                    "updatedRows": len(values),
+                    "updatedColumns": width,
+                    "updatedCells": len(values) * width,
+                },
+            }
+
+    def delete_rows(self, start_index, end_index=None):
+        with self.spreadsheet._call("delete_rows", write=True):
+            del self._values[start_index - 1:end_index or start_index]
+            return {"spreadsheetId": self.spreadsheet.id}
+
+
+class FakeSpreadsheet:
+    def __init__(self, tabs, url="", latency=0.0, rate_limit=0):
+        self.id = "fake-spreadsheet"
+        self.url = url
+        self.title = "Finance Database (fake)"
+        # Seconds slept on every call, and calls allowed per RATE_WINDOW (0 = unlimited)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        # API calls made so far, by operation
+        self.calls = Counter()
+        self._lock = threading.RLock()
+        self._recent_calls = deque()
+        self._updated = datetime.now(timezone.utc)
+        self._worksheets = [FakeWorksheet(self, title, values, index) for index, (title, values) in enumerate(tabs.items())]
+
+    # Standard tabs: the ledger as sheet1, then Helper and Users
+    @classmethod
+    def seeded(cls, ledger_rows=1000, seed=0, url="", latency=0.0, rate_limit=0):
+        tabs = {
+            "Transactions": synthetic_ledger(ledger_rows, seed),
+            "Helper": synthetic_helper(),
+            "Users": synthetic_users(),
+        }
+        return cls(tabs, url=url, latency=latency, rate_limit=rate_limit)
+
+    # Wraps one API call: counts it, enforces the quota, sleeps the latency
+    # and serializes access like a single remote document
+    def _call(self, op, write=False):
+        return _Call(self, op, write)
+
+    def _check_quota(self):
+        if not self.rate_limit:
+            return
+        now = time.monotonic()
+        while self._recent_calls and now - self._recent_calls[0] >= RATE_WINDOW:
+            self._recent_calls.popleft()
+        if len(self._recent_calls) >= self.rate_limit:
+            raise APIError(_FakeResponse(
+                429, "Quota exceeded for quota metric 'Read requests' (simulated)", "RESOURCE_EXHAUSTED"
+            ))
+        self._recent_calls.append(now)
+
+    @property
+    def sheet1(self):
+        return self._worksheets[0]
+
+    def worksheets(self):
+        return list(self._worksheets)
+
+    def worksheet(self, title):
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise WorksheetNotFound(title)
+
+    def get_worksheet(self, index):
+        return self._worksheets[index] if index < len(self._worksheets) else None
+
+    # RFC 3339 time of the last write, as the Drive API reports modifiedTime
+    def get_lastUpdateTime(self):
+        with self._call("get_lastUpdateTime"):
+            return self._updated.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls.clear()
+
+
+class _Call:
+    def __init__(self, spreadsheet, op, write):
+        self.spreadsheet = spreadsheet
+        self.op = op
+        self.write = write
+
+    def __enter__(self):
+        spreadsheet = self.spreadsheet
+        if spreadsheet.latency:
+            time.sleep(spreadsheet.latency)
+        spreadsheet._lock.acquire()
+        try:
+            spreadsheet.calls[self.op] += 1
+            spreadsheet._check_quota()
+        except Exception:
+            spreadsheet._lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.write and exc_type is None:
+                self.spreadsheet._updated = datetime.now(timezone.utc)
+        finally:
+            self.spreadsheet._lock.release()
+        return False
+
+
+# gspread.Client look-alike; every URL or key opens the same spreadsheet
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open_by_url(self, url):
+        self.spreadsheet.url = self.spreadsheet.url or url
+        return self.spreadsheet
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+    def open(self, title):
+        return self.spreadsheet
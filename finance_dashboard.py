@@ -1,34 +1,14 @@
 import streamlit as st
-import gspread
 import pandas as pd
-import plotly.express as px
-from google.oauth2.service_account import Credentials
 from database_analyze import render_database_analysis  # Import the analysis module
+from ledger_aggregates import load_finance_cube
+from ledger_schema import EXPENSE, INCOME, LIQUIDATED, TO_BE_LIQUIDATED
 
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
-
-# Load credentials from Streamlit secrets
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
-
-# Fetch finance data from Google Sheets
-@st.cache_data(ttl=300)
+# Fetch the precomputed finance aggregates
 def fetch_finance_data():
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
-
-        # Convert necessary columns to numeric
-        df["Liquidated amount"] = pd.to_numeric(df["Liquidated amount"], errors="coerce").fillna(0)
-        df["Requested Amount"] = pd.to_numeric(df["Requested Amount"], errors="coerce").fillna(0)
-
-        return df
+        # Updated incrementally from the rows changed since the last render
+        return load_finance_cube()
     except Exception as e:
         st.error(f"Error loading the finance data: {e}")
         return pd.DataFrame()
@@ -39,27 +19,28 @@ def render_finance_dashboard():
     tab1, tab2 = st.tabs(["Overview", "Analysis"])
 
     with tab1:
+        # One row per type / status / payment method / month / day combination
         df = fetch_finance_data()
         if df.empty:
             st.warning("No financial data available.")
             return
 
-        # Calculate financial metrics
-        total_income = df[df["TRX type"].str.lower() == "income"]["Liquidated amount"].sum()
-        total_expense = df[df["TRX type"].str.lower() == "expense"]["Liquidated amount"].sum()
-        issued_funds = df[df["Liquidation status"].str.lower() == "to be liquidated"]["Requested Amount"].sum()
-        available_funds = df["Liquidated amount"].sum() + issued_funds
+        import plotly.express as px  # Deferred: only needed once there is data to chart
 
-        # Prepare data for graphs with reduced complexity
-        df["Liquidation date"] = pd.to_datetime(df["Liquidation date"], errors='coerce')
-        df["Payment date"] = pd.to_datetime(df["Payment date"], errors='coerce')
+        # Row masks shared by the metrics and charts below
+        is_income = df["TRX type"] == INCOME
+        is_expense = df["TRX type"] == EXPENSE
+        is_issued = df["Liquidation status"] == TO_BE_LIQUIDATED
+        is_liquidated = df["Liquidation status"] == LIQUIDATED
 
-        # Aggregate data by month to reduce clutter
-        df["Liquidation Month"] = df["Liquidation date"].dt.to_period("M").astype(str)
-        df["Payment Day"] = df["Payment date"].dt.strftime("%Y-%m-%d")
+        # Calculate financial metrics
+        total_income = df.loc[is_income, "Liquidated amount"].sum()
+        total_expense = df.loc[is_expense, "Liquidated amount"].sum()
+        issued_funds = df.loc[is_issued, "Requested Amount"].sum()
+        available_funds = df["Liquidated amount"].sum() + issued_funds
 
         # Income trend (monthly aggregation, reduced data points)
-        income_data = df[df["TRX type"].str.lower() == "income"].groupby("Liquidation Month")["Liquidated amount"].sum().reset_index()
+        income_data = df[is_income].groupby("Liquidation Month")["Liquidated amount"].sum().reset_index()
         income_chart = px.bar(
             income_data.tail(6),  # Show only the last 6 months
             x="Liquidation Month",
@@ -70,7 +51,7 @@ def render_finance_dashboard():
         )
 
         # Expense trend (monthly aggregation, reduced data points)
-        expense_data = df[df["TRX type"].str.lower() == "expense"].groupby("Liquidation Month")["Liquidated amount"].sum().reset_index()
+        expense_data = df[is_expense].groupby("Liquidation Month")["Liquidated amount"].sum().reset_index()
         expense_chart = px.bar(
             expense_data.tail(6),  # Show only the last 6 months
             x="Liquidation Month",
@@ -81,7 +62,7 @@ def render_finance_dashboard():
         )
 
         # Issued funds trend (recent transactions only)
-        issued_funds_data = df[df["Liquidation status"].str.lower() == "to be liquidated"].groupby("Payment Day")["Requested Amount"].sum().reset_index()
+        issued_funds_data = df[is_issued].groupby("Payment Day")["Requested Amount"].sum().reset_index()
         issued_chart = px.bar(
             issued_funds_data.tail(7),  # Show only the last 7 days
             x="Payment Day",
@@ -93,7 +74,7 @@ def render_finance_dashboard():
 
         # Calculate remaining funds by deducting issued amounts from liquidated funds
         funds_distribution = (
-            df[df["Liquidation status"].str.lower() == "liquidated"]
+            df[is_liquidated]
             .groupby("Payment method")["Liquidated amount"]
             .sum()
             .reset_index()
@@ -101,7 +82,7 @@ def render_finance_dashboard():
 
         # Deduct issued but not yet liquidated funds from available funds
         issued_funds_by_payment = (
-            df[df["Liquidation status"].str.lower() == "to be liquidated"]
+            df[is_issued]
             .groupby("Payment method")["Requested Amount"]
             .sum()
             .reset_index()
@@ -0,0 +1,38 @@
+import pandas as pd
+
+# Period frequencies offered for the funds charts
+GRANULARITIES = {
+    "Day": "D",
+    "Week": "W",
+    "Month": "M",
+    "Quarter": "Q",
+    "Year": "Y",
+}
+
+# Net signed amount per period on a PeriodIndex (income positive, expense
+# negative). Periods without transactions are filled with 0 so cumulative
+# and rolling values line up with the calendar.
+def funds_flow(df, granularity="Month", date_column="Liquidation date", amount_column="Liquidated amount"):
+    dated = df[df[date_column].notna()]
+    if dated.empty:
+        return pd.Series(dtype="int64", name="Net flow")
+
+    amounts = pd.Series(dated[amount_column].to_numpy(), index=pd.DatetimeIndex(dated[date_column]))
+    flow = amounts.groupby(amounts.index.to_period(GRANULARITIES[granularity])).sum()
+    periods = pd.period_range(flow.index.min(), flow.index.max(), freq=flow.index.freq)
+    return flow.reindex(periods, fill_value=0).rename("Net flow")
+
+# Net flow, running balance and rolling average of the net flow per period
+def funds_timeseries(df, granularity="Month", window=3, **columns):
+    flow = funds_flow(df, granularity, **columns)
+    return pd.DataFrame({
+        "Net flow": flow,
+        "Cumulative": flow.cumsum(),
+        "Rolling average": flow.rolling(window, min_periods=1).mean(),
+    })
+
+# Short axis labels; weeks are shown by their first day
+def period_labels(index):
+    if index.freqstr.startswith("W"):
+        return index.start_time.strftime("%Y-%m-%d").tolist()
+    return index.astype(str).tolist()
@@ -86,7 +86,7 @@ def render_sidebar():
         if role == "Admin":
             pages = [
                 "Requests", "Approver", "Payment", "Liquidation",
-                "Database", "Finance Dashboard", "Add Data", "User Profiles"
+                "Database", "Finance Dashboard", "Add Data", "User Profiles", "API Usage"
             ]
         elif role == "Approver":
             pages = ["Approver", "Database"]
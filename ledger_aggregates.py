@@ -0,0 +1,110 @@
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from ledger_mirror import ROW_COLUMN, get_ledger_mirror
+from ledger_schema import load_queued_rows, type_ledger
+
+# Dimensions and measures of the finance cube
+KEY_COLUMNS = ["TRX type", "Liquidation status", "Payment method", "Liquidation Month", "Payment Day"]
+MEASURE_COLUMNS = ["Liquidated amount", "Requested Amount", "Count"]
+SOURCE_COLUMNS = [
+    "TRX type", "Liquidation status", "Payment method",
+    "Liquidation date", "Payment date", "Liquidated amount", "Requested Amount",
+]
+
+
+# Finance totals by type, liquidation status, payment method, liquidation
+# month and payment day. Each ledger row's contribution is remembered, so a
+# refresh only subtracts and re-adds the rows changed since the last one.
+class LedgerAggregates:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, generation):
+        self.generation = generation
+        self.version = 0
+        self.contributions = {}  # sheet row -> (key, liquidated, requested)
+        self.cube = {}  # key -> [liquidated, requested, count]
+        self._frame = None
+
+    def refresh(self, mirror):
+        with self._lock:
+            generation = mirror.generation()
+            if generation != self.generation:
+                self._reset(generation)
+
+            version = mirror.version()
+            if version == self.version:
+                return
+            delta = mirror.changed_rows(self.version, SOURCE_COLUMNS)
+            self._apply(delta)
+            self.version = version
+
+    def _apply(self, delta):
+        if delta.empty:
+            return
+        typed = type_ledger(delta)
+        for row, contribution in zip(typed[ROW_COLUMN], _contributions(typed)):
+            _add(self.cube, self.contributions.pop(row, None), sign=-1)
+            _add(self.cube, contribution, sign=1)
+            self.contributions[row] = contribution
+        self._frame = None
+
+    # The cube as a small DataFrame, rebuilt only after a change. Rows in
+    # `queued` (typed, not yet in the sheet) are added to a copy of it.
+    def frame(self, queued=None):
+        with self._lock:
+            if queued is not None and not queued.empty:
+                cube = {key: list(totals) for key, totals in self.cube.items()}
+                for contribution in _contributions(queued):
+                    _add(cube, contribution, sign=1)
+                return _cube_frame(cube)
+            if self._frame is None:
+                self._frame = _cube_frame(self.cube)
+            return self._frame
+
+
+# (key, liquidated, requested) of each typed row
+def _contributions(typed):
+    keys = zip(
+        typed["TRX type"].astype(str),
+        typed["Liquidation status"].astype(str),
+        typed["Payment method"].astype(str),
+        typed["Liquidation date"].dt.to_period("M").astype(str),
+        typed["Payment date"].dt.strftime("%Y-%m-%d").fillna(""),
+    )
+    for key, liquidated, requested in zip(keys, typed["Liquidated amount"], typed["Requested Amount"]):
+        yield key, int(liquidated), int(requested)
+
+def _add(cube, contribution, sign):
+    if contribution is None:
+        return
+    key, liquidated, requested = contribution
+    totals = cube.setdefault(key, [0, 0, 0])
+    totals[0] += sign * liquidated
+    totals[1] += sign * requested
+    totals[2] += sign
+    if totals[2] == 0:
+        del cube[key]
+
+def _cube_frame(cube):
+    frame = pd.DataFrame([list(key) + totals for key, totals in cube.items()], columns=KEY_COLUMNS + MEASURE_COLUMNS)
+    # Rows without a payment date have no day to be charted on
+    frame["Payment Day"] = frame["Payment Day"].replace("", None)
+    return frame
+
+
+@st.cache_resource
+def get_ledger_aggregates():
+    return LedgerAggregates()
+
+# Up-to-date finance cube; cost depends on the rows changed, not the ledger
+# size. Rows still queued for the sheet are included, so users see their own
+# writes.
+def load_finance_cube():
+    aggregates = get_ledger_aggregates()
+    aggregates.refresh(get_ledger_mirror())
+    return aggregates.frame(load_queued_rows(SOURCE_COLUMNS))
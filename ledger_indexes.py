@@ -0,0 +1,180 @@
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from ledger_mirror import ROW_COLUMN, get_ledger_mirror
+from ledger_schema import FIRST_ROW, append_queued, load_queued_rows, normalize_labels, type_ledger
+
+REQUESTER_COLUMN = "Requester name"
+STATUS_COLUMN = "Approval Status"
+# Status columns the work queues are selected by
+QUEUE_COLUMNS = ["Approval Status", "Payment status", "Liquidation status"]
+
+
+# Sheet rows per requester, plus each requester's count of requests per
+# approval status, kept in step with the mirror from the rows changed since
+# the last refresh, as StatusIndex is. A status patch moves one row between
+# counts instead of regrouping the ledger; a user's view is then read by row
+# number.
+class RequesterIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, generation):
+        self.generation = generation
+        self.version = 0
+        self.entries = {}  # sheet row -> (requester, status)
+        self.members = {}  # requester -> set of sheet rows
+        self.counts = {}  # requester -> {status: count}
+
+    def refresh(self, mirror):
+        with self._lock:
+            generation = mirror.generation()
+            if generation != self.generation:
+                self._reset(generation)
+
+            version = mirror.version()
+            if version == self.version:
+                return
+            self._apply(mirror.changed_rows(self.version, [REQUESTER_COLUMN, STATUS_COLUMN]))
+            self.version = version
+
+    def _apply(self, delta):
+        if delta.empty or REQUESTER_COLUMN not in delta or STATUS_COLUMN not in delta:
+            return
+        requesters = delta[REQUESTER_COLUMN].astype(str)
+        statuses = normalize_labels(delta[STATUS_COLUMN]).astype(str)
+        for row, requester, status in zip(delta[ROW_COLUMN], requesters, statuses):
+            previous = self.entries.pop(row, None)
+            if previous is not None:
+                self._remove(row, *previous)
+            self.entries[row] = (requester, status)
+            self.members.setdefault(requester, set()).add(row)
+            counts = self.counts.setdefault(requester, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    def _remove(self, row, requester, status):
+        self.members[requester].discard(row)
+        counts = self.counts[requester]
+        counts[status] -= 1
+        if not counts[status]:
+            del counts[status]
+        if not self.members[requester]:
+            del self.members[requester]
+            del self.counts[requester]
+
+    # The requester's sheet rows, in sheet order
+    def rows(self, requester):
+        with self._lock:
+            return sorted(self.members.get(requester, ()))
+
+    # Requests per approval status; statuses the requester has none of are left out
+    def status_counts(self, requester):
+        with self._lock:
+            counts = dict(self.counts.get(requester, {}))
+        return pd.Series(counts, dtype="int64").sort_index()
+
+
+# Sheet rows per (status column, normalized status), kept in step with the
+# mirror from the rows changed since the last refresh, so a workflow write
+# moves just that row between sets. A queue is then read by row number
+# instead of scanning the ledger for its status.
+class StatusIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, generation):
+        self.generation = generation
+        self.version = 0
+        self.statuses = {}  # sheet row -> {status column: status}
+        self.members = {}  # (status column, status) -> set of sheet rows
+
+    def refresh(self, mirror):
+        with self._lock:
+            generation = mirror.generation()
+            if generation != self.generation:
+                self._reset(generation)
+
+            version = mirror.version()
+            if version == self.version:
+                return
+            self._apply(mirror.changed_rows(self.version, QUEUE_COLUMNS))
+            self.version = version
+
+    def _apply(self, delta):
+        columns = [column for column in QUEUE_COLUMNS if column in delta]
+        if delta.empty or not columns:
+            return
+        labels = [normalize_labels(delta[column]).astype(str) for column in columns]
+        for row, values in zip(delta[ROW_COLUMN], zip(*labels)):
+            for column, status in self.statuses.pop(row, {}).items():
+                self.members[(column, status)].discard(row)
+            self.statuses[row] = dict(zip(columns, values))
+            for column, status in zip(columns, values):
+                self.members.setdefault((column, status), set()).add(row)
+
+    # Sheet rows whose `column` currently holds `status`, in sheet order
+    def rows(self, column, status):
+        with self._lock:
+            return sorted(self.members.get((column, status), ()))
+
+
+@st.cache_resource
+def get_status_index():
+    return StatusIndex()
+
+# Typed rows whose status `column` is `status`, with only `columns`. Reads the
+# queue's rows by number, so the cost follows the queue length, not the ledger
+# size. Only rows already in the sheet are included, as only those can be
+# transitioned; see load_queued_status for the rest.
+def load_status_queue(column, status, columns=None):
+    mirror = get_ledger_mirror()
+    index = get_status_index()
+    index.refresh(mirror)
+
+    rows = mirror.rows_at(index.rows(column, status), _with_column(columns, column))
+    rows.index = rows.pop(ROW_COLUMN) - FIRST_ROW
+    return type_ledger(rows)
+
+# Rows with `status` in `column` that are still queued for the sheet. They
+# join the queue once the write journal has appended them.
+def load_queued_status(column, status, columns=None):
+    queued = load_queued_rows(_with_column(columns, column))
+    if queued.empty or column not in queued:
+        return queued.iloc[0:0]
+    return queued[queued[column] == status]
+
+def _with_column(columns, column):
+    return list(columns) + [column] if columns and column not in columns else columns
+
+
+@st.cache_resource
+def get_requester_index():
+    return RequesterIndex()
+
+# The requester's typed rows with only `columns`, and their count of requests
+# per approval status. Rows are read by number, so the cost follows the
+# requester's own rows, not the ledger size. Rows still queued for the sheet
+# are included, so users see their own submissions.
+def load_requester_requests(requester, columns=None):
+    mirror = get_ledger_mirror()
+    index = get_requester_index()
+    index.refresh(mirror)
+
+    rows = mirror.rows_at(index.rows(requester), columns)
+    rows.index = rows.pop(ROW_COLUMN) - FIRST_ROW
+    rows = type_ledger(rows)
+    counts = index.status_counts(requester)
+
+    queued = load_queued_rows(_with_column(_with_column(columns, REQUESTER_COLUMN), STATUS_COLUMN))
+    if queued.empty or REQUESTER_COLUMN not in queued:
+        return rows, counts
+    queued = queued[queued[REQUESTER_COLUMN].astype(str) == requester]
+    if queued.empty:
+        return rows, counts
+    queued_counts = queued[STATUS_COLUMN].astype(str).value_counts()
+    counts = counts.add(queued_counts, fill_value=0).astype("int64").sort_index()
+    return append_queued(rows, queued[[column for column in rows.columns if column in queued]]), counts
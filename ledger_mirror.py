@@ -0,0 +1,485 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+from gspread.utils import a1_to_rowcol, numericise_all, rowcol_to_a1
+
+from app_config import CACHE_DIR
+from sheets_client import get_ledger_sheet, get_spreadsheet
+
+# Local SQLite mirror of the transactions sheet (sheet1)
+MIRROR_PATH = os.path.join(CACHE_DIR, "ledger.sqlite")
+LEDGER_TABLE = "ledger"
+ROW_COLUMN = "_row"  # sheet row number of each mirrored record
+VERSION_COLUMN = "_version"  # mirror version that last changed the record
+HASH_COLUMN = "_hash"  # digest of the row's text as last read from the sheet
+TRX_ID_COLUMN = "TRX ID"
+
+# Bump when the mirror layout changes so old files are rebuilt
+SCHEMA_VERSION = 3
+
+# Background sync: pull appended rows often, reconcile the whole sheet rarely
+# so edits made directly in Google Sheets are picked up as well. Both are
+# skipped while the spreadsheet's Drive modifiedTime stays the same.
+SYNC_INTERVAL = 30
+FULL_SYNC_INTERVAL = 900
+
+logger = logging.getLogger(__name__)
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _column_letter(col):
+    return rowcol_to_a1(1, col)[:-1]
+
+# A row's cells as text, cut or padded to the header width
+def _pad_row(row, width):
+    return [str(value) for value in row[:width]] + [""] * (width - len(row))
+
+# Same conversion get_all_records applies, done once at sync time
+def _normalize_row(row, width):
+    return numericise_all(_pad_row(row, width))
+
+# Stable across processes, unlike hash(); compared before any parsing
+def _row_hash(padded_row):
+    return hashlib.blake2b("\x1f".join(padded_row).encode(), digest_size=8).hexdigest()
+
+
+class LedgerMirror:
+    def __init__(self, path, sheet, spreadsheet=None):
+        self.path = path
+        self.sheet = sheet
+        self.spreadsheet = spreadsheet  # probed for its modifiedTime, if given
+        self._probe_failed = False
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._thread = None
+        self._trx_index = (None, {})
+
+        self._conn = open_database(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        if self._get_meta("schema_version") != str(SCHEMA_VERSION):
+            with self._transaction():
+                self._conn.execute(f"DROP TABLE IF EXISTS {LEDGER_TABLE}")
+                self._conn.execute("DELETE FROM meta")
+                self._set_meta("schema_version", SCHEMA_VERSION)
+
+    # Metadata helpers
+    def _get_meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _transaction(self):
+        return Transaction(self._conn, self._lock)
+
+    def headers(self):
+        with self._lock:
+            return json.loads(self._get_meta("headers", "[]"))
+
+    def synced_rows(self):
+        with self._lock:
+            return int(self._get_meta("synced_rows", 0))
+
+    # Increases on every change to the mirrored data
+    def version(self):
+        with self._lock:
+            return int(self._get_meta("version", 0))
+
+    # Increases only when rows are appended, removed or reordered
+    def layout_version(self):
+        with self._lock:
+            return int(self._get_meta("layout_version", 0))
+
+    # Increases on every full reload; row versions from an older generation
+    # cannot be compared, so incremental consumers start over
+    def generation(self):
+        with self._lock:
+            return int(self._get_meta("generation", 0))
+
+    def _bump_version(self, layout=False):
+        version = int(self._get_meta("version", 0)) + 1
+        self._set_meta("version", version)
+        if layout:
+            self._set_meta("layout_version", int(self._get_meta("layout_version", 0)) + 1)
+        return version
+
+    # Pull changes from the sheet. A one-call probe of the spreadsheet's
+    # modifiedTime comes first: if nothing changed, nothing is downloaded.
+    # Otherwise appended rows are fetched on their own, and the whole sheet
+    # is only reconciled on first use, on request, or every FULL_SYNC_INTERVAL.
+    # force: skip the probe and fetch anyway. Drive's modifiedTime can lag
+    # behind a write, so callers that must see a write just made use this.
+    def sync(self, full=False, force=False):
+        with self._sync_lock:
+            modified = None if force else self._modified_time()
+            headers = self.headers()
+            if not headers:
+                return self._full_sync(modified)
+
+            with self._lock:
+                last_full_sync = float(self._get_meta("last_full_sync", 0))
+                synced_modified = self._get_meta("synced_modified")
+                reconciled_modified = self._get_meta("reconciled_modified")
+            due = time.time() - last_full_sync >= FULL_SYNC_INTERVAL
+            if not full and modified is not None:
+                # Unchanged since the last reconcile: the mirror still matches
+                # the whole sheet, so a due reconcile counts as done
+                if modified == reconciled_modified:
+                    if due:
+                        with self._transaction():
+                            self._mark_reconciled(modified)
+                    return 0
+                # Unchanged since the last tail fetch, with no reconcile due yet
+                if modified == synced_modified and not due:
+                    return 0
+            if full or due:
+                return self._reconcile(modified)
+            count = self._tail_sync(headers)
+            with self._transaction():
+                self._set_meta("synced_modified", modified or "")
+            return count
+
+    # Drive modifiedTime of the spreadsheet (any tab), or None if it cannot be
+    # read (no spreadsheet handle, or credentials without the Drive scope)
+    def _modified_time(self):
+        if self.spreadsheet is None or self._probe_failed:
+            return None
+        try:
+            return self.spreadsheet.get_lastUpdateTime()
+        except Exception as e:
+            logger.warning("Cannot read the spreadsheet modifiedTime, syncing without it: %s", e)
+            self._probe_failed = True
+            return None
+
+    # Full download, written to a fresh table. Consumers of changed_rows
+    # start over, as the generation changes.
+    def _full_sync(self, modified=None):
+        return self._reload(self.sheet.get_all_values(), modified)
+
+    def _reload(self, values, modified):
+        headers = values[0] if values else []
+        rows = values[1:]
+
+        with self._transaction():
+            self._conn.execute(f"DROP TABLE IF EXISTS {LEDGER_TABLE}")
+            columns = ", ".join(_quote(header) for header in headers)
+            self._conn.execute(
+                f"CREATE TABLE {LEDGER_TABLE} ({ROW_COLUMN} INTEGER PRIMARY KEY, {VERSION_COLUMN} INTEGER, "
+                f"{HASH_COLUMN} TEXT{', ' + columns if columns else ''})"
+            )
+            self._conn.execute(f"CREATE INDEX {LEDGER_TABLE}_version ON {LEDGER_TABLE} ({VERSION_COLUMN})")
+            version = self._bump_version(layout=True)
+            self._set_meta("headers", json.dumps(headers))
+            self._insert_rows(rows, start_row=2, version=version)
+            self._set_meta("synced_rows", len(rows))
+            self._set_meta("generation", self.generation() + 1)
+            self._mark_reconciled(modified)
+        return len(rows)
+
+    def _mark_reconciled(self, modified):
+        self._set_meta("last_full_sync", time.time())
+        self._set_meta("synced_modified", modified or "")
+        self._set_meta("reconciled_modified", modified or "")
+
+    # Full download compared with the mirror. Rows are matched by a digest of
+    # their text, so only rows that differ are parsed, and only those whose
+    # content changed are rewritten with a new version: an unchanged sheet
+    # costs one download and nothing downstream. New headers or a shrunken
+    # sheet (rows were removed) fall back to a full reload. Rows the app
+    # patched while the download was under way keep the newer patched values.
+    def _reconcile(self, modified=None):
+        with self._lock:
+            started_version = int(self._get_meta("version", 0))
+        values = self.sheet.get_all_values()
+        headers = self.headers()
+        if not values or values[0] != headers:
+            return self._reload(values, modified)
+        width = len(headers)
+        rows = {row_number: _pad_row(row, width) for row_number, row in enumerate(values[1:], start=2)}
+        trx_id_index = headers.index(TRX_ID_COLUMN) if TRX_ID_COLUMN in headers else None
+        columns = ", ".join([ROW_COLUMN, VERSION_COLUMN] + [_quote(header) for header in headers])
+
+        # Compared and written in one transaction, so no patch lands in between
+        with self._transaction():
+            hashes = dict(self._conn.execute(f"SELECT {ROW_COLUMN}, {HASH_COLUMN} FROM {LEDGER_TABLE}"))
+            shrunk = any(row_number not in rows for row_number in hashes)
+            if not shrunk:
+                candidates = [
+                    row_number for row_number, row in rows.items() if hashes.get(row_number) != _row_hash(row)
+                ]
+                # Differing text may still parse to the mirrored values, e.g. a
+                # row patched by the app, whose digest is unknown until read back
+                mirrored = {
+                    record[0]: (record[1], list(record[2:]))
+                    for record in self._conn.execute(
+                        f"SELECT {columns} FROM {LEDGER_TABLE} WHERE {ROW_COLUMN} IN (SELECT value FROM json_each(?))",
+                        (json.dumps(candidates),),
+                    )
+                }
+                changed, rehashed = [], []
+                layout_changed = False
+                for row_number in candidates:
+                    row_version, current = mirrored.get(row_number, (None, None))
+                    if row_version is not None and row_version > started_version:
+                        continue
+                    parsed = numericise_all(rows[row_number])
+                    if current == parsed:
+                        rehashed.append(row_number)
+                        continue
+                    changed.append(row_number)
+                    if current is None or (trx_id_index is not None and current[trx_id_index] != parsed[trx_id_index]):
+                        layout_changed = True
+
+                if changed:
+                    version = self._bump_version(layout=layout_changed)
+                    self._write_rows(((row_number, rows[row_number]) for row_number in changed), version)
+                self._conn.executemany(
+                    f"UPDATE {LEDGER_TABLE} SET {HASH_COLUMN} = ? WHERE {ROW_COLUMN} = ?",
+                    ((_row_hash(rows[row_number]), row_number) for row_number in rehashed),
+                )
+                self._set_meta("synced_rows", len(rows))
+                self._mark_reconciled(modified)
+        if shrunk:
+            return self._reload(values, modified)
+        return len(changed)
+
+    def _tail_sync(self, headers):
+        start_row = self.synced_rows() + 2
+        values = self.sheet.get(f"A{start_row}:{_column_letter(len(headers))}")
+        if not values:
+            return 0
+
+        with self._transaction():
+            version = self._bump_version(layout=True)
+            self._insert_rows(values, start_row=start_row, version=version)
+            synced_rows = max(self.synced_rows(), start_row - 2 + len(values))
+            self._set_meta("synced_rows", synced_rows)
+        return len(values)
+
+    def _insert_rows(self, rows, start_row, version):
+        self._write_rows(enumerate(rows, start=start_row), version)
+
+    # numbered_rows: (sheet row number, cells as read from the sheet) pairs
+    def _write_rows(self, numbered_rows, version):
+        headers = self.headers()
+        if not headers:
+            return
+        columns = ", ".join([ROW_COLUMN, VERSION_COLUMN, HASH_COLUMN] + [_quote(header) for header in headers])
+        placeholders = ", ".join(["?"] * (len(headers) + 3))
+
+        def records():
+            for row_number, row in numbered_rows:
+                padded = _pad_row(row, len(headers))
+                yield [row_number, version, _row_hash(padded)] + numericise_all(padded)
+
+        self._conn.executemany(f"INSERT OR REPLACE INTO {LEDGER_TABLE} ({columns}) VALUES ({placeholders})", records())
+
+    # Write-through for rows the app just appended, starting at first_row.
+    # The synced tail only advances when there is no gap before first_row,
+    # so rows appended by other sessions are still fetched by the next sync.
+    def add_rows(self, first_row, rows):
+        headers = self.headers()
+        if not headers or not rows:
+            return
+        with self._transaction():
+            version = self._bump_version(layout=True)
+            self._insert_rows(rows, start_row=first_row, version=version)
+            synced_rows = self.synced_rows()
+            if first_row <= synced_rows + 2:
+                self._set_meta("synced_rows", max(synced_rows, first_row - 2 + len(rows)))
+
+    # Write-through for cells the app just updated in the sheet
+    # changes: {sheet row number: {header: value}}
+    def patch_rows(self, changes):
+        if not changes:
+            return
+        with self._transaction():
+            version = self._bump_version()
+            for row_number, values in changes.items():
+                # The sheet may format the written values differently, so the
+                # row's digest is cleared and taken again at the next reconcile
+                assignments = ", ".join(
+                    [f"{VERSION_COLUMN} = ?", f"{HASH_COLUMN} = NULL"] + [f"{_quote(header)} = ?" for header in values]
+                )
+                params = [version] + numericise_all([str(value) for value in values.values()]) + [row_number]
+                self._conn.execute(f"UPDATE {LEDGER_TABLE} SET {assignments} WHERE {ROW_COLUMN} = ?", params)
+
+    # TRX ID -> sheet row number. Rebuilt only when the row layout changes;
+    # cell patches never move rows. Duplicate IDs resolve to the first row.
+    def trx_rows(self):
+        layout_version = self.layout_version()
+        cached_version, index = self._trx_index
+        if cached_version == layout_version:
+            return index
+
+        index = {}
+        if TRX_ID_COLUMN in self.headers():
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {_quote(TRX_ID_COLUMN)}, {ROW_COLUMN} FROM {LEDGER_TABLE} ORDER BY {ROW_COLUMN}"
+                ).fetchall()
+            for trx_id, row_number in rows:
+                index.setdefault(str(trx_id), row_number)
+        self._trx_index = (layout_version, index)
+        return index
+
+    # Records changed after since_version, with their sheet row numbers
+    def changed_rows(self, since_version, columns=None):
+        headers = self.headers()
+        if not headers:
+            return pd.DataFrame(columns=[ROW_COLUMN])
+        selected = [ROW_COLUMN] + [column for column in (columns or headers) if column in headers]
+        query = (
+            f"SELECT {', '.join(_quote(column) for column in selected)} FROM {LEDGER_TABLE} "
+            f"WHERE {VERSION_COLUMN} > ? ORDER BY {ROW_COLUMN}"
+        )
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=(since_version,))
+
+    # Records at the given sheet rows, with their row numbers, in sheet order
+    def rows_at(self, row_numbers, columns=None):
+        headers = self.headers()
+        if not headers:
+            return pd.DataFrame(columns=[ROW_COLUMN])
+        selected = [ROW_COLUMN] + [column for column in (columns or headers) if column in headers]
+        query = (
+            f"SELECT {', '.join(_quote(column) for column in selected)} FROM {LEDGER_TABLE} "
+            f"WHERE {ROW_COLUMN} IN (SELECT value FROM json_each(?)) ORDER BY {ROW_COLUMN}"
+        )
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=(json.dumps(list(row_numbers)),))
+
+    # Mirrored records as a DataFrame, shaped like get_all_records()
+    def load(self, columns=None):
+        headers = self.headers()
+        if not headers:
+            return pd.DataFrame()
+        selected = [column for column in (columns or headers) if column in headers]
+        query = f"SELECT {', '.join(_quote(column) for column in selected)} FROM {LEDGER_TABLE} ORDER BY {ROW_COLUMN}"
+        with self._lock:
+            return pd.read_sql_query(query, self._conn)
+
+    # Rows that are not mirrored (e.g. still queued for the sheet) as a
+    # DataFrame shaped like load(), with values normalized the same way
+    def frame_for(self, rows):
+        headers = self.headers()
+        return pd.DataFrame([_normalize_row(row, len(headers)) for row in rows], columns=headers)
+
+    # WHERE clause for {column: text} filters (case-insensitive "contains")
+    def _filter_clause(self, filters):
+        headers = self.headers()
+        conditions, params = [], []
+        for column, text in (filters or {}).items():
+            if column in headers and text:
+                escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                conditions.append(f"CAST({_quote(column)} AS TEXT) LIKE ? ESCAPE '\\'")
+                params.append(f"%{escaped}%")
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    # One page of records with projection, filtering and sorting done in SQLite
+    def query_page(self, columns=None, filters=None, sort_by=None, descending=False, limit=50, offset=0):
+        headers = self.headers()
+        if not headers:
+            return pd.DataFrame()
+        selected = [column for column in (columns or headers) if column in headers]
+        where, params = self._filter_clause(filters)
+        order = f"{_quote(sort_by)} {'DESC' if descending else 'ASC'}, " if sort_by in headers else ""
+        query = (
+            f"SELECT {', '.join(_quote(column) for column in selected)} FROM {LEDGER_TABLE}{where} "
+            f"ORDER BY {order}{ROW_COLUMN} LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params + [limit, offset])
+
+    def count(self, filters=None):
+        if not self.headers():
+            return 0
+        where, params = self._filter_clause(filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {LEDGER_TABLE}{where}", params).fetchone()[0]
+
+    # Number of records per distinct value of a column
+    def value_counts(self, column):
+        if column not in self.headers():
+            return pd.Series(dtype="int64")
+        query = f"SELECT {_quote(column)} AS value, COUNT(*) AS count FROM {LEDGER_TABLE} GROUP BY {_quote(column)}"
+        with self._lock:
+            counts = pd.read_sql_query(query, self._conn)
+        return counts.set_index("value")["count"]
+
+    def start_background_sync(self, interval=SYNC_INTERVAL):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._sync_loop, args=(interval,), name="ledger-mirror-sync", daemon=True
+        )
+        self._thread.start()
+
+    def _sync_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Background ledger sync failed")
+
+
+# SQLite connection shared by this process's threads, in autocommit mode so
+# writes go through Transaction; WAL lets other processes read meanwhile
+def open_database(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+# Write transaction on a shared connection: serializes this process's threads
+# on `lock` and other processes on SQLite's write lock (BEGIN IMMEDIATE)
+class Transaction:
+    def __init__(self, conn, lock):
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+        return False
+
+
+# Process-wide mirror, synced in the background once created
+@st.cache_resource
+def get_ledger_mirror():
+    mirror = LedgerMirror(MIRROR_PATH, get_ledger_sheet(), get_spreadsheet())
+    if not mirror.headers():
+        mirror.sync(full=True)
+    mirror.start_background_sync()
+    return mirror
+
+# Transactions as a DataFrame, read from the local mirror
+def load_ledger(columns=None):
+    return get_ledger_mirror().load(columns)
+
+# Record rows just written with append_row/append_rows, using the range
+# reported in the API response, without reading the sheet back
+def record_append(response, rows, mirror=None):
+    updated_range = response["updates"]["updatedRange"]
+    first_row, _ = a1_to_rowcol(updated_range.split("!")[-1].split(":")[0])
+    (mirror or get_ledger_mirror()).add_rows(first_row, rows)
+    return first_row
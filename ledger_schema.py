@@ -0,0 +1,193 @@
+import logging
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from ledger_mirror import ROW_COLUMN, TRX_ID_COLUMN, get_ledger_mirror
+from write_journal import get_write_journal
+
+# Results keyed on ledger_version() never go stale, so the TTL only bounds
+# how long unused entries stay in memory
+LEDGER_CACHE_TTL = 3600
+
+logger = logging.getLogger(__name__)
+
+# Sheet row of the first record; typed frames are indexed by row - FIRST_ROW,
+# which is the record's position while the sheet has no gaps
+FIRST_ROW = 2
+
+# Declared types of the transactions sheet columns
+AMOUNT_COLUMNS = ["Requested Amount", "Liquidated amount", "Returned amount"]
+DATE_COLUMNS = ["Request submission date", "Approval date", "Payment date", "Liquidation date"]
+CATEGORY_COLUMNS = ["TRX type", "Approval Status", "Payment status", "Liquidation status"]
+
+# Formats the app writes: timestamps from the workflow pages, dates from Add Data
+DATE_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]
+
+# Canonical values of the type and status columns after normalization
+INCOME = "Income"
+EXPENSE = "Expense"
+PENDING = "Pending"
+APPROVED = "Approved"
+DECLINED = "Declined"
+ISSUED = "Issued"
+TO_BE_LIQUIDATED = "To be liquidated"
+LIQUIDATED = "Liquidated"
+# Canonical spelling by matching key (case and spacing ignored)
+KNOWN_LABELS = {
+    label.casefold(): label
+    for label in [INCOME, EXPENSE, PENDING, APPROVED, DECLINED, ISSUED, TO_BE_LIQUIDATED, LIQUIDATED]
+}
+
+# Amounts are whole IQD; blanks and unparsable values count as 0
+def parse_amounts(values):
+    text = values.astype(str).str.replace(",", "", regex=False).str.strip()
+    return pd.to_numeric(text, errors="coerce").fillna(0).round().astype("int64")
+
+# Dates in the formats the app writes. Anything else (e.g. a date retyped by
+# hand in the sheet) is left blank and logged rather than guessed at, as
+# 03/04/2026 could be either day first or month first.
+def parse_dates(values):
+    text = values.astype(str).str.strip()
+    parsed = pd.to_datetime(text, format=DATE_FORMATS[0], errors="coerce")
+    for date_format in DATE_FORMATS[1:]:
+        missing = parsed.isna() & (text != "")
+        if not missing.any():
+            return parsed
+        parsed = parsed.fillna(pd.to_datetime(text[missing], format=date_format, errors="coerce"))
+
+    unparsed = text[parsed.isna() & (text != "")]
+    if not unparsed.empty:
+        logger.warning(
+            "%d %s value(s) are not in a known date format and are treated as blank, e.g. %r",
+            len(unparsed), values.name or "date", unparsed.iloc[0],
+        )
+    return parsed
+
+# Labels that match a known type or status up to case and spacing ("approved ",
+# "APPROVED") take its canonical spelling, so pages can compare against it;
+# any other label keeps the sheet's spelling, trimmed
+def normalize_labels(values):
+    text = values.astype(str).astype("category")
+    categories = text.cat.categories
+    labels = [_label(value) for value in categories]
+    if len(set(labels)) == len(labels):
+        return text.cat.rename_categories(labels)
+    return text.astype(str).map(dict(zip(categories, labels))).astype("category")
+
+def _label(value):
+    value = value.strip()
+    return KNOWN_LABELS.get(" ".join(value.split()).casefold(), value)
+
+# Concatenated typed frames have different categories per part, so pandas
+# falls back to object columns; make them categorical again
+def restore_categories(df):
+    for column in CATEGORY_COLUMNS:
+        if column in df and df[column].dtype != "category":
+            df[column] = df[column].astype("category")
+    return df
+
+# Convert a raw ledger frame to the declared schema
+def type_ledger(df):
+    df = df.copy()
+    for column in AMOUNT_COLUMNS:
+        if column in df:
+            df[column] = parse_amounts(df[column])
+    for column in DATE_COLUMNS:
+        if column in df:
+            df[column] = parse_dates(df[column])
+    for column in CATEGORY_COLUMNS:
+        if column in df:
+            df[column] = normalize_labels(df[column])
+    return df
+
+# The typed ledger, or a projection of it, kept in step with the mirror.
+# Only rows changed since the last refresh are read and parsed, and only the
+# requested columns; a full reload starts over. Every refresh builds a new
+# frame, so frames already handed out never change.
+class TypedLedger:
+    def __init__(self, columns=None):
+        self.columns = list(columns) if columns else None  # None: every column
+        self._lock = threading.Lock()
+        self.generation = None
+        self.version = 0
+        self.frame = None
+
+    def refresh(self, mirror):
+        with self._lock:
+            generation = mirror.generation()
+            if generation != self.generation:
+                self.generation, self.version, self.frame = generation, 0, None
+
+            version = mirror.version()
+            if self.frame is not None and version == self.version:
+                return self.frame
+            delta = mirror.changed_rows(self.version, self.columns)
+            delta.index = delta.pop(ROW_COLUMN) - FIRST_ROW
+            self.frame = self._splice(type_ledger(delta))
+            self.version = version
+            return self.frame
+
+    def _splice(self, delta):
+        if self.frame is None or self.frame.empty:
+            return delta
+        if delta.empty:
+            return self.frame
+        appended_only = delta.index.min() > self.frame.index.max()
+        kept = self.frame if appended_only else self.frame[~self.frame.index.isin(delta.index)]
+        frame = pd.concat([kept, delta])
+        if not appended_only:
+            frame = frame.sort_index()
+        return restore_categories(frame)
+
+
+# One per column manifest (a tuple, or None for the full ledger)
+@st.cache_resource
+def get_typed_ledger(columns=None):
+    return TypedLedger(columns)
+
+# Cache key for anything derived from the ledger: changes with every write,
+# whether it is already in the mirror or still queued in the write journal
+def ledger_version():
+    return get_ledger_mirror().version(), get_write_journal().state()
+
+# Rows still queued in the write journal and not yet mirrored, typed and cut
+# to `columns`
+def load_queued_rows(columns=None):
+    mirror = get_ledger_mirror()
+    headers = mirror.headers()
+    rows = get_write_journal().pending_rows()
+    if rows and TRX_ID_COLUMN in headers:
+        # Plain lookups: the TRX ID index covers the whole ledger
+        mirrored = mirror.trx_rows()
+        position = headers.index(TRX_ID_COLUMN)
+        rows = [row for row in rows if position >= len(row) or str(row[position]) not in mirrored]
+    queued = mirror.frame_for(rows)
+    if columns:
+        queued = queued[[column for column in columns if column in queued]]
+    return type_ledger(queued)
+
+# Append queued rows after the last row of a typed frame
+def append_queued(frame, queued):
+    if queued.empty:
+        return frame
+    start = frame.index.max() + 1 if not frame.empty else 0
+    queued.index = pd.RangeIndex(start, start + len(queued))
+    return restore_categories(pd.concat([frame, queued]))
+
+# One parsed frame per ledger version and column manifest, shared by every
+# page and session. Rows still queued for the sheet are included, so users see
+# their own writes. Treat it as read-only: filter or copy it instead of
+# adding columns.
+@st.cache_resource(max_entries=16)
+def _typed_snapshot(version, journal_state, columns):
+    frame = get_typed_ledger(columns).refresh(get_ledger_mirror())
+    if not journal_state[0]:
+        return frame
+    return append_queued(frame, load_queued_rows(columns))
+
+# Typed ledger with only `columns` (a page's column manifest), so pages
+# read and parse just what they show; all columns by default
+def load_typed_ledger(columns=None):
+    return _typed_snapshot(*ledger_version(), tuple(columns) if columns else None)
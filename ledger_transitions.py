@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytz
+from gspread.utils import ValueInputOption, rowcol_to_a1
+
+from ledger_mirror import TRX_ID_COLUMN, get_ledger_mirror
+from sheets_client import get_ledger_sheet
+
+BAGHDAD_TZ = pytz.timezone("Asia/Baghdad")
+
+# Current time in the format stored in the sheet
+def baghdad_now():
+    return datetime.now(BAGHDAD_TZ).strftime("%Y-%m-%d %H:%M:%S")
+
+# Cell changes for an approval decision
+def approval_changes(status, approval_date=None):
+    changes = {
+        "Approval Status": status,
+        "Approval date": approval_date or baghdad_now(),
+    }
+    if status == "Approved":
+        changes["Payment status"] = "Pending"
+    return changes
+
+# Cell changes for issuing a payment
+def payment_changes(payment_date=None):
+    return {
+        "Payment status": "Issued",
+        "Payment date": payment_date or baghdad_now(),
+        "Liquidation status": "To be liquidated",
+    }
+
+# Cell changes for a liquidation (both amounts are negative for expenses)
+def liquidation_changes(requested_amount, liquidated_amount, invoices_link, liquidation_date=None):
+    return {
+        "Liquidation status": "Liquidated",
+        "Liquidated amount": liquidated_amount,
+        "Liquidation date": liquidation_date or baghdad_now(),
+        "Liquidated invoices": invoices_link,
+        "Returned amount": liquidated_amount - requested_amount,
+    }
+
+# Look up sheet rows in the mirror's TRX ID index and confirm them with one
+# small read of the TRX ID cells, so a row inserted or deleted directly in the
+# sheet can never redirect a write to the wrong transaction. Returns the
+# confirmed rows, and whether any indexed row held a different TRX ID (the
+# sheet was reordered since the mirror's last full sync).
+def _find_rows(sheet, mirror, trx_ids):
+    headers = mirror.headers()
+    trx_id_col = headers.index(TRX_ID_COLUMN) + 1
+
+    index = mirror.trx_rows()
+    rows = {trx_id: index[trx_id] for trx_id in trx_ids if trx_id in index}
+    if not rows:
+        return headers, {}, False
+    cells = sheet.batch_get([rowcol_to_a1(row_index, trx_id_col) for row_index in rows.values()])
+    found = [cell[0][0] if cell and cell[0] else "" for cell in cells]
+    confirmed = {trx_id: row_index for (trx_id, row_index), value in zip(rows.items(), found) if value == trx_id}
+    return headers, confirmed, len(confirmed) < len(rows)
+
+def _resolve_rows(sheet, trx_ids):
+    mirror = get_ledger_mirror()
+    headers, rows, moved = _find_rows(sheet, mirror, trx_ids)
+    if not moved and len(rows) < len(trx_ids):
+        # Unknown IDs may have been appended since the last sync: fetch the tail
+        mirror.sync(force=True)
+        headers, rows, moved = _find_rows(sheet, mirror, trx_ids)
+    if moved:
+        # Rows moved in the sheet: reconcile the mirror once and look again.
+        # Only confirmed rows are written, whatever is still unresolved.
+        mirror.sync(full=True)
+        headers, rows, moved = _find_rows(sheet, mirror, trx_ids)
+    return mirror, headers, rows
+
+# Apply workflow transitions for one or many rows in a single batch_update.
+# changes: {trx_id: {header: value}}. Returns the TRX IDs that were not found.
+def apply_transitions(changes):
+    if not changes:
+        return []
+
+    sheet = get_ledger_sheet()
+    mirror, headers, rows = _resolve_rows(sheet, list(changes))
+
+    data = []
+    mirror_changes = {}
+    for trx_id, values in changes.items():
+        row_index = rows.get(trx_id)
+        if row_index is None:
+            continue
+        for header, value in values.items():
+            data.append({"range": rowcol_to_a1(row_index, headers.index(header) + 1), "values": [[value]]})
+        mirror_changes[row_index] = values
+
+    if data:
+        sheet.batch_update(data, value_input_option=ValueInputOption.user_entered)
+        # Keep the local mirror in step with the sheet
+        mirror.patch_rows(mirror_changes)
+
+    return [trx_id for trx_id in changes if trx_id not in rows]
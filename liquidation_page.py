@@ -1,64 +1,33 @@
-import gspread
 import streamlit as st
-from google.oauth2.service_account import Credentials
-from datetime import datetime
 import pandas as pd
-import pytz
+from ledger_indexes import load_status_queue
+from ledger_schema import LEDGER_CACHE_TTL, TO_BE_LIQUIDATED, ledger_version
+from ledger_transitions import apply_transitions, liquidation_changes
+from work_queue import work_queue_page
 
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
-
-# Load credentials from Streamlit secrets
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
+# Ledger columns this page reads
+LEDGER_COLUMNS = [
+    "TRX ID", "Project name", "Budget line", "Purpose", "Requested Amount",
+    "Payment date", "Payment method", "Liquidation status",
+]
 
 # Fetch all pending liquidations
-@st.cache_data(ttl=60)
-def fetch_pending_liquidations():
+# version: ledger_version(); any write to the ledger gives a new cache entry
+@st.cache_data(ttl=LEDGER_CACHE_TTL)
+def fetch_pending_liquidations(version):
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-        data = sheet.get_all_records()
-
-        # Convert data to DataFrame and filter for "To be liquidated" status
-        df = pd.DataFrame(data)
-        pending_liquidations = df[df["Liquidation status"].str.lower() == "to be liquidated"]
-        return pending_liquidations
+        # "To be liquidated" rows, read by row number from the status index
+        return load_status_queue("Liquidation status", TO_BE_LIQUIDATED, LEDGER_COLUMNS)
     except Exception as e:
         st.error(f"Error fetching pending liquidations: {e}")
         return pd.DataFrame()  # Return empty DataFrame on error
 
 # Update liquidation status, amount, invoices, and returned amount
-def process_liquidation(sheet, trx_id, liquidated_amount, invoices_link):
+def process_liquidation(trx_id, requested_amount, liquidated_amount, invoices_link):
     try:
-        baghdad_tz = pytz.timezone("Asia/Baghdad")
-        liquidation_date = datetime.now(baghdad_tz).strftime("%Y-%m-%d %H:%M:%S")
-
-        # Get all data to find the row index
-        data = sheet.get_all_values()
-        headers = data[0]  
-        trx_id_col = headers.index("TRX ID") + 1  
-
-        for i, row in enumerate(data):
-            if row[trx_id_col - 1] == trx_id:
-                row_index = i + 1  
-                requested_amount = int(row[headers.index("Requested Amount")])
-
-                # Calculate returned amount
-                returned_amount = liquidated_amount - requested_amount
-
-                # Update cells in the sheet
-                sheet.update_cell(row_index, headers.index("Liquidation status") + 1, "Liquidated")
-                sheet.update_cell(row_index, headers.index("Liquidated amount") + 1, liquidated_amount)
-                sheet.update_cell(row_index, headers.index("Liquidation date") + 1, liquidation_date)
-                sheet.update_cell(row_index, headers.index("Liquidated invoices") + 1, invoices_link)
-                sheet.update_cell(row_index, headers.index("Returned amount") + 1, returned_amount)
-
-                return True
-        return False
+        changes = liquidation_changes(int(requested_amount), liquidated_amount, invoices_link)
+        missing = apply_transitions({trx_id: changes})
+        return not missing
     except Exception as e:
         st.error(f"Error processing liquidation: {e}")
         return False
@@ -72,11 +41,8 @@ def render_liquidation_page():
         st.session_state["processed_liquidation"] = None
 
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-
         # Fetch pending liquidations
-        pending_liquidations = fetch_pending_liquidations()
+        pending_liquidations = fetch_pending_liquidations(ledger_version())
 
         if pending_liquidations.empty:
             st.info("No pending liquidations to process.")
@@ -85,8 +51,9 @@ def render_liquidation_page():
         # Create a list to track processed requests
         processed_requests = []
 
-        # Accordion style expander for pending liquidations
-        for index, request in pending_liquidations.iterrows():
+        # Accordion style expander for the pending liquidations of the current page
+        visible_liquidations = work_queue_page(pending_liquidations, "liquidation", sort_by="Payment date")
+        for index, request in visible_liquidations.iterrows():
             if st.session_state.get("processed_liquidation") == request["TRX ID"]:
                 continue  # Skip already processed items
 
@@ -119,7 +86,9 @@ def render_liquidation_page():
                         # Ensure liquidated amount is stored as negative
                         liquidated_amount = -abs(int(liquidated_amount.replace(",", "")))
 
-                        success = process_liquidation(sheet, request["TRX ID"], liquidated_amount, invoices_link)
+                        success = process_liquidation(
+                            request["TRX ID"], request["Requested Amount"], liquidated_amount, invoices_link
+                        )
                         if success:
                             st.session_state["processed_liquidation"] = request["TRX ID"]
                             processed_requests.append(request["TRX ID"])
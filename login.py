@@ -1,33 +1,8 @@
-import gspread
 import streamlit as st
-from google.oauth2.service_account import Credentials
-import pandas as pd
 import hashlib
 import datetime
 import random
-from streamlit_lottie import st_lottie
-import requests
-
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
-
-# Load credentials from Streamlit secrets
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
-
-# Fetch user data from Google Sheets
-def fetch_user_data():
-    try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).worksheet("Users")
-        data = sheet.get_all_records()
-        return pd.DataFrame(data)
-    except Exception as e:
-        st.error(f"Error fetching user data: {e}")
-        return pd.DataFrame()
+from login_animation import load_login_animation
 
 # Hash password
 def hash_password(password):
@@ -54,16 +29,6 @@ climate_facts = [
     "🚲 Switching to cycling for short trips can reduce CO₂ emissions by 67%."
 ]
 
-# Load Lottie animation from URL
-def load_lottieurl(url: str):
-    r = requests.get(url)
-    if r.status_code != 200:
-        return None
-    return r.json()
-
-# Animation URL (replace with any Lottie animation URL you prefer)
-LOTTIE_URL = "https://assets1.lottiefiles.com/packages/lf20_hs1shz7u.json"
-
 # Custom Styling for Modern UI
 def set_custom_css():
     st.markdown(
@@ -157,9 +122,10 @@ def set_custom_css():
 def render_login():
     set_custom_css()
 
-    # Display Lottie animation at the top
-    lottie_animation = load_lottieurl(LOTTIE_URL)
+    # Display Lottie animation at the top (skipped until it has been downloaded)
+    lottie_animation = load_login_animation()
     if lottie_animation:
+        from streamlit_lottie import st_lottie
         st_lottie(lottie_animation, height=200, key="login_animation")
 
     st.markdown("<div class='header'>Hasar Organization</div>", unsafe_allow_html=True)
@@ -190,15 +156,15 @@ def render_login():
             return
 
         try:
-            # Fetch users from Google Sheets
-            users = fetch_user_data()
-            user = users[users["Email"].str.lower() == email.lower()]
+            # Look up the user in the cached directory (imported here so the
+            # Sheets client is only loaded once someone signs in)
+            from user_directory import find_user
+            user = find_user(email)
 
-            if user.empty:
+            if user is None:
                 st.error("❌ User not found.")
                 return
 
-            user = user.iloc[0]
             hashed_password = user["Password"]
             role = user["Role"]
 
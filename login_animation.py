@@ -0,0 +1,79 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import streamlit as st
+
+from app_config import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Animation URL (replace with any Lottie animation URL you prefer)
+LOTTIE_URL = "https://assets1.lottiefiles.com/packages/lf20_hs1shz7u.json"
+LOTTIE_PATH = os.path.join(CACHE_DIR, "login_animation.json")
+LOTTIE_TIMEOUT = 5
+# Re-download the animation once a day; wait a minute after a failed attempt
+LOTTIE_REFRESH_INTERVAL = 24 * 3600
+LOTTIE_RETRY_INTERVAL = 60
+
+
+# Login animation served from memory. The JSON is cached on disk after the
+# first download and refreshed by a background thread, so rendering the login
+# page never waits on the CDN and still works offline.
+class LoginAnimation:
+    def __init__(self, url, path):
+        self.url = url
+        self.path = path
+        self._lock = threading.Lock()
+        self._fetching = False
+        self._last_attempt = 0
+        self.animation, self.fetched_at = self._read_disk()
+
+    def _read_disk(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f), os.path.getmtime(self.path)
+        except (OSError, ValueError):
+            return None, 0
+
+    # Current animation (None until the first download finishes)
+    def get(self):
+        with self._lock:
+            now = time.time()
+            stale = now - self.fetched_at > LOTTIE_REFRESH_INTERVAL
+            if stale and not self._fetching and now - self._last_attempt > LOTTIE_RETRY_INTERVAL:
+                self._fetching = True
+                self._last_attempt = now
+                threading.Thread(target=self._refresh, name="login-animation", daemon=True).start()
+            return self.animation
+
+    def _refresh(self):
+        try:
+            import requests
+            r = requests.get(self.url, timeout=LOTTIE_TIMEOUT)
+            if r.status_code != 200:
+                return
+            animation = r.json()
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(animation, f)
+            os.replace(tmp_path, self.path)
+            with self._lock:
+                self.animation, self.fetched_at = animation, time.time()
+        except Exception as e:
+            logger.warning("Could not refresh the login animation: %s", e)
+        finally:
+            with self._lock:
+                self._fetching = False
+
+
+@st.cache_resource
+def get_login_animation():
+    return LoginAnimation(LOTTIE_URL, LOTTIE_PATH)
+
+# Lottie JSON for the login page, or None if it has never been downloaded
+def load_login_animation():
+    return get_login_animation().get()
@@ -1,61 +1,35 @@
-import gspread
 import streamlit as st
-from google.oauth2.service_account import Credentials
-from datetime import datetime
 import pandas as pd
-import pytz
+from ledger_indexes import load_status_queue
+from ledger_schema import LEDGER_CACHE_TTL, PENDING, ledger_version
+from ledger_transitions import apply_transitions, payment_changes
+from work_queue import work_queue_page
 
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
-
-# Load credentials from Streamlit secrets
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
+# Ledger columns this page reads
+LEDGER_COLUMNS = [
+    "TRX ID", "Project name", "Budget line", "Purpose", "Requested Amount",
+    "Request submission date", "Approval date", "Payment status",
+]
 
 # Fetch all pending payments
-@st.cache_data(ttl=0)  # No caching to ensure fresh data
-def fetch_pending_payments():
+# version: ledger_version(); any write to the ledger gives a new cache entry
+@st.cache_data(ttl=LEDGER_CACHE_TTL)
+def fetch_pending_payments(version):
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-        data = sheet.get_all_records()
-
-        # Convert data to DataFrame and filter for pending payments
-        df = pd.DataFrame(data)
-        pending_payments = df[df["Payment status"].str.lower() == "pending"]
-        return pending_payments
+        # Pending payments, read by row number from the status index
+        return load_status_queue("Payment status", PENDING, LEDGER_COLUMNS)
     except Exception as e:
         st.error(f"Error fetching pending payments: {e}")
         return pd.DataFrame()  # Return empty DataFrame on error
 
 # Update payment status and date
-def issue_payment(sheet, trx_id):
+def issue_payment(trx_id):
     try:
-        baghdad_tz = pytz.timezone("Asia/Baghdad")
-        payment_date = datetime.now(baghdad_tz).strftime("%Y-%m-%d %H:%M:%S")
-
-        data = sheet.get_all_values()
-        headers = data[0]
-        trx_id_col = headers.index("TRX ID") + 1
-
-        for i, row in enumerate(data):
-            if row[trx_id_col - 1] == trx_id:
-                row_index = i + 1
-                payment_status_col = headers.index("Payment status") + 1
-                payment_date_col = headers.index("Payment date") + 1
-                liquidation_status_col = headers.index("Liquidation status") + 1
-
-                # Update payment details
-                sheet.update_cell(row_index, payment_status_col, "Issued")
-                sheet.update_cell(row_index, payment_date_col, payment_date)
-                sheet.update_cell(row_index, liquidation_status_col, "To be liquidated")
-
-                return True
-        st.error("TRX ID not found in the database.")
-        return False
+        missing = apply_transitions({trx_id: payment_changes()})
+        if missing:
+            st.error("TRX ID not found in the database.")
+            return False
+        return True
     except Exception as e:
         st.error(f"Error issuing payment: {e}")
         return False
@@ -65,11 +39,8 @@ def render_payment_page():
     st.write("View and process pending payments.")
 
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-
         # Fetch pending payments
-        pending_payments = fetch_pending_payments()
+        pending_payments = fetch_pending_payments(ledger_version())
 
         if pending_payments.empty:
             st.info("No pending payments to process.")
@@ -104,8 +75,9 @@ def render_payment_page():
             </style>
         """, unsafe_allow_html=True)
 
-        # Display each pending payment inside an expander
-        for _, request in pending_payments.iterrows():
+        # Display each pending payment of the current page inside an expander
+        visible_payments = work_queue_page(pending_payments, "payment", sort_by="Approval date")
+        for _, request in visible_payments.iterrows():
             with st.expander(f"Request ID: {request['TRX ID']} - {request['Project name']}"):
                 st.markdown("<div class='expander-body'>", unsafe_allow_html=True)
                 st.write(f"**Budget Line:** {request['Budget line']}")
@@ -116,7 +88,7 @@ def render_payment_page():
 
                 # Approve Button
                 if st.button(f"Issue Payment for {request['TRX ID']}", key=f"pay_{request['TRX ID']}"):
-                    if issue_payment(sheet, request["TRX ID"]):
+                    if issue_payment(request["TRX ID"]):
                         st.session_state["issued_payment"] = request["TRX ID"]
                         st.success(f"Payment issued for request {request['TRX ID']}.")
                         st.rerun()  # This will rerun the app and remove the issued payment
@@ -0,0 +1,79 @@
+import gspread
+import streamlit as st
+from google.auth.transport.requests import AuthorizedSession
+from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
+
+import app_config
+from sheets_metrics import instrument_client
+from sheets_scheduler import get_scheduler
+
+# Google Sheets setup
+GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
+# The Drive metadata scope lets the ledger mirror read the spreadsheet's
+# modifiedTime, a cheap check for changes before downloading anything
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive.metadata.readonly",
+]
+
+# Worksheet names used across the app
+HELPER_SHEET = "Helper"
+USERS_SHEET = "Users"
+
+# Keep-alive connections shared by all Streamlit sessions of this process
+HTTP_POOL_SIZE = 10
+
+# Load credentials from Streamlit secrets
+def load_credentials():
+    key_data = st.secrets["GOOGLE_CREDENTIALS"]
+    return Credentials.from_service_account_info(key_data, scopes=SCOPES)
+
+# Authorized gspread client (or the offline fake, see app_config). The
+# AuthorizedSession keeps the HTTP connections alive and only refreshes the
+# access token once it expires.
+def _connect():
+    if app_config.SHEETS_BACKEND == "fake":
+        from fake_sheets import FakeClient, FakeSpreadsheet
+        return FakeClient(FakeSpreadsheet.seeded(
+            ledger_rows=app_config.FAKE_LEDGER_ROWS,
+            seed=app_config.FAKE_SEED,
+            latency=app_config.FAKE_LATENCY,
+            rate_limit=app_config.FAKE_RATE_LIMIT,
+        ))
+
+    session = AuthorizedSession(load_credentials())
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    return gspread.authorize(None, session=session)
+
+# One client per process. Every API call it makes is recorded in
+# sheets_metrics and goes through the quota-aware sheets_scheduler.
+@st.cache_resource
+def get_client():
+    return instrument_client(_connect(), get_scheduler())
+
+# Spreadsheet handle, opened once per process
+@st.cache_resource
+def get_spreadsheet():
+    return get_client().open_by_url(GOOGLE_SHEET_URL)
+
+# Worksheet handles are cached so pages skip the metadata round-trip
+@st.cache_resource
+def get_worksheet(name=None):
+    spreadsheet = get_spreadsheet()
+    if name is None:
+        return spreadsheet.sheet1
+    return spreadsheet.worksheet(name)
+
+# Transactions sheet (sheet1)
+def get_ledger_sheet():
+    return get_worksheet()
+
+# Helper tab with dropdown options
+def get_helper_sheet():
+    return get_worksheet(HELPER_SHEET)
+
+# Users tab with login accounts
+def get_users_sheet():
+    return get_worksheet(USERS_SHEET)
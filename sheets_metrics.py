@@ -0,0 +1,212 @@
+import contextvars
+import csv
+import io
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+import streamlit as st
+
+# Optional JSON Lines file every call is appended to, for offline analysis
+METRICS_LOG = os.environ.get("FINANCE_SHEETS_METRICS_LOG", "")
+# Calls kept in memory for the API Usage page
+MAX_RECORDS = 50_000
+
+# gspread methods that reach the API, by quota they count against
+READ_OPERATIONS = {
+    "get_all_values", "get_all_records", "get", "get_values", "batch_get",
+    "row_values", "col_values", "acell", "cell", "findall", "find",
+}
+WRITE_OPERATIONS = {
+    "update", "update_cell", "update_cells", "update_acell", "batch_update",
+    "append_row", "append_rows", "insert_row", "insert_rows", "delete_rows", "batch_clear", "clear",
+}
+# Metadata calls: counted as reads, but their result is a handle, not data
+METADATA_OPERATIONS = {
+    "open_by_url", "open_by_key", "worksheet", "worksheets", "get_worksheet", "sheet1", "get_lastUpdateTime",
+}
+
+CSV_FIELDS = ["time", "op", "kind", "page", "render", "latency_ms", "bytes", "error"]
+
+# Page and script run the current thread is working for. Background threads
+# (e.g. the ledger mirror sync) keep the default.
+_current_page = contextvars.ContextVar("sheets_page", default="background")
+_current_render = contextvars.ContextVar("sheets_render", default=None)
+_render_ids = itertools.count(1)
+
+# Approximate size of the values sent or received, in characters
+def payload_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(payload_size(key) + payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    return len(str(value))
+
+
+# Process-wide log of Sheets API calls
+class SheetsMetrics:
+    def __init__(self, log_path=METRICS_LOG, max_records=MAX_RECORDS):
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=max_records)
+        self._renders = deque(maxlen=max_records)  # (time, page) per script run
+
+    def begin_render(self, page):
+        with self._lock:
+            self._renders.append((time.time(), page))
+
+    # Script runs per page since `since`
+    def render_counts(self, since=0):
+        with self._lock:
+            return Counter(page for started, page in self._renders if started >= since)
+
+    def record(self, op, kind, latency, size, error=""):
+        record = {
+            "time": time.time(),
+            "op": op,
+            "kind": kind,
+            "page": _current_page.get(),
+            "render": _current_render.get(),
+            "latency_ms": round(latency * 1000, 1),
+            "bytes": size,
+            "error": error,
+        }
+        with self._lock:
+            self._records.append(record)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    # Run one API call, recording it whether it succeeds or fails
+    def timed(self, op, kind, function, args, kwargs):
+        started = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except Exception as e:
+            self.record(op, kind, time.perf_counter() - started, 0, error=f"{type(e).__name__}: {e}")
+            raise
+        if op in METADATA_OPERATIONS:
+            size = 0
+        elif kind == "write":
+            size = payload_size([args, kwargs])
+        else:
+            size = payload_size(result)
+        self.record(op, kind, time.perf_counter() - started, size)
+        return result
+
+    def records(self, since=0):
+        with self._lock:
+            return [record for record in self._records if record["time"] >= since]
+
+    # Reads and writes made in the last `window` seconds
+    def recent_counts(self, window=60):
+        counts = Counter(record["kind"] for record in self.records(time.time() - window))
+        return counts["read"], counts["write"]
+
+    def to_csv(self):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(self.records())
+        return buffer.getvalue()
+
+    def to_jsonl(self):
+        return "".join(json.dumps(record) + "\n" for record in self.records())
+
+
+# gspread object wrapper that times every API method through SheetsMetrics.
+# With a scheduler (sheets_scheduler.py), calls are routed through it for
+# rate limiting, retries and write coalescing; each attempt is recorded.
+class _Instrumented:
+    def __init__(self, target, metrics, scheduler=None):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_metrics", metrics)
+        object.__setattr__(self, "_scheduler", scheduler)
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        kind = _operation_kind(name)
+        if kind is None or not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            if self._scheduler is None:
+                return self._wrap(self.timed_call(name, args, kwargs))
+            return self._wrap(self._scheduler.call(self, name, kind, args, kwargs))
+        return call
+
+    # One recorded call of the wrapped object's method
+    def timed_call(self, name, args, kwargs):
+        return self._metrics.timed(name, _operation_kind(name), getattr(self._target, name), args, kwargs)
+
+    # Identifies the wrapped worksheet across handles
+    @property
+    def key(self):
+        target = self._target
+        return (getattr(target, "spreadsheet_id", None), getattr(target, "id", id(target)))
+
+    def _child(self, cls, target):
+        return cls(target, self._metrics, self._scheduler)
+
+    def _wrap(self, result):
+        return result
+
+    def __repr__(self):
+        return f"Instrumented({self._target!r})"
+
+
+class InstrumentedWorksheet(_Instrumented):
+    pass
+
+
+class InstrumentedSpreadsheet(_Instrumented):
+    # Worksheets handed out are instrumented too
+    def _wrap(self, result):
+        if isinstance(result, list):
+            return [self._child(InstrumentedWorksheet, worksheet) for worksheet in result]
+        if result is not None and hasattr(result, "get_all_values"):
+            return self._child(InstrumentedWorksheet, result)
+        return result
+
+    # sheet1 is a property, but gspread fetches the metadata to resolve it
+    @property
+    def sheet1(self):
+        def fetch():
+            return self._metrics.timed("sheet1", "read", lambda: self._target.sheet1, (), {})
+        worksheet = fetch() if self._scheduler is None else self._scheduler.run("read", fetch)
+        return self._child(InstrumentedWorksheet, worksheet)
+
+
+class InstrumentedClient(_Instrumented):
+    def _wrap(self, result):
+        return self._child(InstrumentedSpreadsheet, result)
+
+
+def _operation_kind(name):
+    if name in WRITE_OPERATIONS:
+        return "write"
+    if name in READ_OPERATIONS or name in METADATA_OPERATIONS:
+        return "read"
+    return None
+
+
+@st.cache_resource
+def get_sheets_metrics():
+    return SheetsMetrics()
+
+# Attribute the calls of this script run to `page`
+def begin_render(page):
+    _current_page.set(page)
+    _current_render.set(next(_render_ids))
+    get_sheets_metrics().begin_render(page)
+
+# Client whose spreadsheets and worksheets record every API call
+def instrument_client(client, scheduler=None):
+    return InstrumentedClient(client, get_sheets_metrics(), scheduler)
@@ -0,0 +1,189 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import streamlit as st
+from gspread.exceptions import APIError
+from gspread.utils import ValueInputOption, rowcol_to_a1
+from requests.exceptions import ConnectionError, Timeout
+
+from app_config import SHEETS_READ_QUOTA, SHEETS_WRITE_QUOTA
+
+logger = logging.getLogger(__name__)
+
+# Quotas are counted per minute
+QUOTA_WINDOW = 60
+# Truncated exponential backoff with full jitter, as Google recommends
+MAX_RETRIES = 6
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 32.0
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+RATE_LIMIT_CODE = 429
+# Writes that set values: sent twice, they leave the sheet as sent once
+IDEMPOTENT_WRITES = {"update", "update_cell", "update_cells", "update_acell", "batch_update", "batch_clear", "clear"}
+# gspread's update_cell writes with USER_ENTERED
+UPDATE_CELL_INPUT_OPTION = ValueInputOption.user_entered
+
+# Rate limit errors, which are rejected before anything is applied, and for
+# idempotent calls also transient server or network failures. An append,
+# insert or delete that failed that way may still have been applied, so it
+# is not repeated; the caller checks the sheet instead.
+def is_retryable(error, idempotent=True):
+    if isinstance(error, APIError):
+        return error.code == RATE_LIMIT_CODE or (idempotent and error.code in RETRYABLE_CODES)
+    return idempotent and isinstance(error, (ConnectionError, Timeout))
+
+def backoff_delay(attempt):
+    return random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt))
+
+
+# Allows at most `limit` calls in any `window` seconds; callers over the
+# limit wait for the oldest call to leave the window
+class RateLimiter:
+    def __init__(self, limit, window=QUOTA_WINDOW):
+        self.limit = limit
+        self.window = window
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.window:
+                    self._calls.popleft()
+                if len(self._calls) < self.limit:
+                    self._calls.append(now)
+                    return
+                wait = self.window - (now - self._calls[0])
+            time.sleep(wait)
+
+
+# One write queued for coalescing
+class _PendingWrite:
+    def __init__(self, data):
+        self.data = data
+        self.future = Future()
+
+
+# Central gate for Sheets API calls: every call waits for quota and is
+# retried on 429 (reads and value writes also on 5xx and network errors),
+# and cell writes queued for the same worksheet while one is in flight are
+# merged into a single batch_update
+class SheetsScheduler:
+    def __init__(self, read_quota=SHEETS_READ_QUOTA, write_quota=SHEETS_WRITE_QUOTA):
+        self.limiters = {"read": RateLimiter(read_quota), "write": RateLimiter(write_quota)}
+        self._lock = threading.Lock()
+        self._pending = {}  # (worksheet key, value input option) -> [_PendingWrite]
+        self._flushing = set()
+
+    # Route one API call from an instrumented gspread proxy (sheets_metrics).
+    # Cell writes are coalesced per worksheet; everything else runs as is.
+    def call(self, proxy, name, kind, args, kwargs):
+        if name == "batch_update" and len(args) == 1 and set(kwargs) <= {"value_input_option"}:
+            return self.write_cells(
+                proxy.key, args[0], kwargs.get("value_input_option"),
+                lambda data: proxy.timed_call(name, (data,), kwargs),
+            )
+        if name == "update_cell" and len(args) == 3 and not kwargs:
+            batch_kwargs = {"value_input_option": UPDATE_CELL_INPUT_OPTION}
+            return self.write_cells(
+                proxy.key, cell_update(*args), UPDATE_CELL_INPUT_OPTION,
+                lambda data: proxy.timed_call("batch_update", (data,), batch_kwargs),
+            )
+        idempotent = kind == "read" or name in IDEMPOTENT_WRITES
+        return self.run(kind, lambda: proxy.timed_call(name, args, kwargs), idempotent=idempotent)
+
+    # Call function() within the quota, retrying transient failures.
+    # acquired: the caller already took quota for the first attempt.
+    # idempotent: function() is safe to repeat after a failure that may have
+    # been applied; otherwise only rate limit errors are retried.
+    def run(self, kind, function, acquired=False, idempotent=True):
+        attempt = 0
+        while True:
+            if not acquired:
+                self.limiters[kind].acquire()
+            acquired = False
+            try:
+                return function()
+            except Exception as e:
+                if attempt >= MAX_RETRIES or not is_retryable(e, idempotent):
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning("Sheets %s failed (%s), retrying in %.1fs", kind, e, delay)
+                time.sleep(delay)
+                attempt += 1
+
+    # Queue cell updates for one worksheet and wait until they are written.
+    # send(data) performs one batch_update. The first caller becomes the
+    # flusher; callers arriving while it waits for quota or for the API are
+    # merged into its next request instead of sending their own.
+    def write_cells(self, worksheet_key, data, value_input_option, send):
+        key = (worksheet_key, value_input_option)
+        write = _PendingWrite(data)
+        with self._lock:
+            self._pending.setdefault(key, []).append(write)
+            leader = key not in self._flushing
+            self._flushing.add(key)
+        if leader:
+            self._flush(key, send)
+        return write.future.result()
+
+    def _flush(self, key, send):
+        batch = []
+        try:
+            while True:
+                with self._lock:
+                    if not self._pending.get(key):
+                        self._pending.pop(key, None)
+                        self._flushing.discard(key)
+                        return
+                # Writes keep queuing while this waits for quota
+                self.limiters["write"].acquire()
+                with self._lock:
+                    batch = self._pending.pop(key)
+
+                try:
+                    data = merge_cell_updates([write.data for write in batch])
+                    result = self.run("write", lambda: send(data), acquired=True)
+                except Exception as e:
+                    for write in batch:
+                        write.future.set_exception(e)
+                else:
+                    for write in batch:
+                        write.future.set_result(result)
+                batch = []
+        except BaseException as e:
+            # The flusher itself failed (e.g. interrupted while waiting for
+            # quota): fail every write it was holding or would have sent and
+            # step down, so no writer waits on it forever
+            with self._lock:
+                stranded = batch + self._pending.pop(key, [])
+                self._flushing.discard(key)
+            for write in stranded:
+                if not write.future.done():
+                    write.future.set_exception(e)
+            raise
+
+
+# Concatenate queued batch_update payloads; a cell written twice keeps the
+# latest value
+def merge_cell_updates(batches):
+    merged = {}
+    for data in batches:
+        for update in data:
+            merged.pop(update["range"], None)
+            merged[update["range"]] = update
+    return list(merged.values())
+
+# update_cell as a one-cell batch_update payload
+def cell_update(row, col, value):
+    return [{"range": rowcol_to_a1(row, col), "values": [[value]]}]
+
+
+@st.cache_resource
+def get_scheduler():
+    return SheetsScheduler()
@@ -0,0 +1,73 @@
+import argparse
+import re
+import resource
+import subprocess
+import sys
+
+# Modules on the login path and behind each page of the app
+DEFAULT_MODULES = ["app_config", "layout", "login"]
+PAGE_MODULES = [
+    "submit_request", "view_requests", "approver_page", "payment_page", "liquidation_page",
+    "database", "finance_dashboard", "add_data", "user_profiles",
+]
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "gspread", "google.oauth2", "requests", "streamlit_lottie"]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Import the modules in a fresh interpreter with -X importtime. Returns
+# ({module: (self_us, cumulative_us, depth)}, heavy modules loaded, peak RSS in KiB)
+def profile_imports(modules):
+    script = (
+        "import sys\n"
+        f"for name in {modules!r}: __import__(name)\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script], capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings[name] = (int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    heavy = [name for name in proc.stdout.strip().split(",") if name]
+    # Peak memory of the profiled interpreter (the only child process)
+    peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return timings, heavy, peak_rss
+
+def print_report(modules, timings, heavy, peak_rss, top):
+    top_level = [name for name, (_, _, depth) in timings.items() if depth == 0]
+    total_ms = sum(timings[name][1] for name in top_level) / 1000
+    print(f"Modules:        {', '.join(modules)}")
+    print(f"Import time:    {total_ms:,.1f} ms")
+    print(f"Peak RSS:       {peak_rss / 1024:,.1f} MiB")
+    print(f"Heavy modules:  {', '.join(heavy) or 'none'}")
+    print()
+    print("Slowest top-level imports (cumulative):")
+    for name in sorted(top_level, key=lambda name: timings[name][1], reverse=True)[:top]:
+        print(f"  {timings[name][1] / 1000:9.1f} ms  {name}")
+    print()
+    print("Slowest individual modules (self):")
+    for name in sorted(timings, key=lambda name: timings[name][0], reverse=True)[:top]:
+        print(f"  {timings[name][0] / 1000:9.1f} ms  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize python -X importtime for the app's startup path.")
+    parser.add_argument("modules", nargs="*", help=f"modules to import (default: {' '.join(DEFAULT_MODULES)})")
+    parser.add_argument("--pages", action="store_true", help="also import every page module")
+    parser.add_argument("--top", type=int, default=15, help="number of entries per table")
+    args = parser.parse_args()
+
+    modules = args.modules or list(DEFAULT_MODULES)
+    if args.pages:
+        modules += PAGE_MODULES
+
+    timings, heavy, peak_rss = profile_imports(modules)
+    print_report(modules, timings, heavy, peak_rss, args.top)
+
+if __name__ == "__main__":
+    main()
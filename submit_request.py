@@ -1,25 +1,15 @@
-import gspread
 import streamlit as st
-from google.oauth2.service_account import Credentials
 from datetime import datetime
 import pytz
-
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
-
-# Load credentials from Streamlit secrets
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
+from sheets_client import get_helper_sheet
+from trx_ids import next_trx_id
+from write_journal import journal_rows
 
 # Fetch dropdown options from the Helper tab
 @st.cache_data(ttl=60)
 def fetch_dropdown_options():
     try:
-        client = load_credentials()
-        helper_sheet = client.open_by_url(GOOGLE_SHEET_URL).worksheet("Helper")
+        helper_sheet = get_helper_sheet()
         helper_data = helper_sheet.get_all_records()
 
         dropdown_options = {
@@ -31,20 +21,6 @@ def fetch_dropdown_options():
         st.error(f"Error fetching dropdown options: {e}")
         return {"Project Name": [], "Payment Method": []}
 
-# Generate the next TRX ID
-def generate_trx_id(sheet):
-    try:
-        all_rows = sheet.get_all_records()
-        if all_rows:
-            last_trx_id = all_rows[-1].get("TRX ID", "TRX-0000")
-            next_id_number = int(last_trx_id.split("-")[1]) + 1
-            return f"TRX-{next_id_number:04d}"
-        else:
-            return "TRX-0001"
-    except Exception as e:
-        st.error(f"Error generating TRX ID: {e}")
-        return "TRX-0001"
-
 # Render the Request Submission Page
 def render_request_form():
     # Remove this line as the main title is already at the top
@@ -123,11 +99,8 @@ def render_request_form():
         try:
             total_amount = -int(total_amount_str.replace(",", ""))  # Convert to negative integer
 
-            client = load_credentials()
-            sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-
             # Generate TRX ID
-            trx_id = generate_trx_id(sheet)
+            trx_id = next_trx_id()
 
             # Get the current date and time in Baghdad timezone
             baghdad_tz = pytz.timezone("Asia/Baghdad")
@@ -162,8 +135,8 @@ def render_request_form():
                 notes,  # Remarks
             ]
 
-            # Append the data to the Google Sheet
-            sheet.append_row(new_row)
+            # Journal the row; it is appended to the Google Sheet in the background
+            journal_rows([new_row])
 
             st.success(f"Request submitted successfully! TRX ID: {trx_id}")
         except Exception as e:
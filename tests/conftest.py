@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests run against the offline backend and import the app's flat modules
+os.environ.setdefault("FINANCE_SHEETS_BACKEND", "fake")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from add_data import build_import_rows, validate_import
+from fake_sheets import LEDGER_HEADERS
+
+OPTIONS = {"TRX type": ["Income", "Expense"], "TRX category": ["Grant"], "Payment method": ["Cash"]}
+
+
+def import_frame(**columns):
+    row = {
+        "TRX type": "Expense", "TRX category": "Grant", "Purpose": "p", "Detail": "d", "Payment method": "Cash",
+        "Liquidated amount": "1,500", "Supplier/Donor": "s", "Contribution": "c",
+    }
+    rows = [dict(row, **{column: value}) for column, values in columns.items() for value in values] or [row]
+    return pd.DataFrame(rows)
+
+
+def errors(report):
+    return report["Error"].tolist()
+
+
+def test_valid_row_is_signed_and_dated():
+    records, report = validate_import(import_frame(**{"Payment date": ["2026-06-01"]}), OPTIONS)
+    assert report.empty
+    row = dict(zip(LEDGER_HEADERS, build_import_rows(records, ["TRX-1"], LEDGER_HEADERS)[0]))
+    assert row["TRX ID"] == "TRX-1"
+    assert row["Liquidated amount"] == -1500 and type(row["Liquidated amount"]) is int
+    assert records[["Payment date", "Liquidation date"]].values.tolist() == [["2026-06-01", "2026-06-01"]]
+
+
+def test_fractional_amounts_are_rejected():
+    records, report = validate_import(import_frame(**{"Liquidated amount": ["2000.5", "2000.0", "abc"]}), OPTIONS)
+    assert records["Liquidated amount"].tolist() == [-2000]
+    assert errors(report) == ["Liquidated amount is not a whole number", "Liquidated amount is not a number"]
+
+
+def test_only_listed_date_formats_are_accepted():
+    dates = ["2026-06-01", "2026-06-01 00:00:00", "01/07/2026", "7 June 2026", "2026-13-01"]
+    records, report = validate_import(import_frame(**{"Payment date": dates}), OPTIONS)
+    assert records["Payment date"].tolist() == ["2026-06-01", "2026-06-01"]
+    assert report["Row"].tolist() == [4, 5, 6]
+    assert set(errors(report)) == {"Payment date is not a YYYY-MM-DD date"}
+
+
+def test_rows_follow_the_sheet_column_order():
+    records, _ = validate_import(import_frame(), OPTIONS)
+    headers = list(reversed(LEDGER_HEADERS)) + ["Added later"]
+    row = dict(zip(headers, build_import_rows(records, ["TRX-1"], headers)[0]))
+    assert len(row) == len(headers)
+    assert (row["TRX ID"], row["Purpose"], row["Liquidated amount"], row["Added later"]) == ("TRX-1", "p", -1500, "")
+
+
+def test_sheet_without_an_import_column_is_rejected():
+    records, _ = validate_import(import_frame(), OPTIONS)
+    headers = [header for header in LEDGER_HEADERS if header != "Supplier/Donor"]
+    with pytest.raises(ValueError, match="Supplier/Donor"):
+        build_import_rows(records, ["TRX-1"], headers)
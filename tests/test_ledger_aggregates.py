@@ -0,0 +1,121 @@
+import pytest
+
+import ledger_aggregates
+import ledger_schema
+from fake_sheets import LEDGER_HEADERS, FakeSpreadsheet
+from ledger_aggregates import SOURCE_COLUMNS, LedgerAggregates, load_finance_cube
+from ledger_mirror import ROW_COLUMN, LedgerMirror
+from ledger_schema import EXPENSE, INCOME, LIQUIDATED, TO_BE_LIQUIDATED, type_ledger
+from write_journal import WriteJournal
+
+
+class SheetDown:
+    def append_rows(self, rows, **kwargs):
+        raise ConnectionError("down")
+
+
+@pytest.fixture
+def spreadsheet():
+    return FakeSpreadsheet.seeded(200)
+
+
+@pytest.fixture
+def mirror(spreadsheet, tmp_path, monkeypatch):
+    mirror = LedgerMirror(str(tmp_path / "mirror.sqlite"), spreadsheet.sheet1, spreadsheet)
+    mirror.sync()
+    aggregates = LedgerAggregates()
+    monkeypatch.setattr(ledger_aggregates, "get_ledger_mirror", lambda: mirror)
+    monkeypatch.setattr(ledger_aggregates, "get_ledger_aggregates", lambda: aggregates)
+    monkeypatch.setattr(ledger_schema, "get_ledger_mirror", lambda: mirror)
+    return mirror
+
+
+@pytest.fixture
+def journal(mirror, tmp_path, monkeypatch):
+    journal = WriteJournal(str(tmp_path / "journal.sqlite"), SheetDown(), mirror)
+    monkeypatch.setattr(ledger_schema, "get_write_journal", lambda: journal)
+    return journal
+
+
+def totals(cube):
+    return cube[["Liquidated amount", "Requested Amount", "Count"]].sum().tolist()
+
+
+def test_queued_rows_are_counted_until_they_reach_the_sheet(spreadsheet, mirror, journal):
+    before = totals(load_finance_cube())
+    row = dict.fromkeys(LEDGER_HEADERS, "")
+    row.update({
+        "TRX ID": "TRX-QUEUED", "TRX type": "Income", "Payment method": "Cash", "Payment status": "Issued",
+        "Payment date": "2026-06-01", "Liquidation status": "Liquidated", "Liquidated amount": 1500,
+        "Liquidation date": "2026-06-01",
+    })
+    journal.enqueue([[row[header] for header in LEDGER_HEADERS]])
+
+    cube = load_finance_cube()
+    assert totals(cube) == [before[0] + 1500, before[1], before[2] + 1]
+    assert cube.loc[cube["Liquidation Month"] == "2026-06", "Count"].sum() >= 1
+
+    # Once appended, the row is counted once, from the mirror
+    journal.sheet = spreadsheet.sheet1
+    journal.flush()
+    assert totals(load_finance_cube()) == [before[0] + 1500, before[1], before[2] + 1]
+
+
+# The Finance Dashboard's figures, from the cube or from typed ledger rows
+def dashboard_figures(df):
+    is_income = df["TRX type"] == INCOME
+    is_expense = df["TRX type"] == EXPENSE
+    is_issued = df["Liquidation status"] == TO_BE_LIQUIDATED
+    is_liquidated = df["Liquidation status"] == LIQUIDATED
+
+    def by(mask, key, amount):
+        return df[mask].groupby(key)[amount].sum().to_dict()
+
+    return {
+        "total_income": df.loc[is_income, "Liquidated amount"].sum(),
+        "total_expense": df.loc[is_expense, "Liquidated amount"].sum(),
+        "issued_funds": df.loc[is_issued, "Requested Amount"].sum(),
+        "available_funds": df["Liquidated amount"].sum() + df.loc[is_issued, "Requested Amount"].sum(),
+        "income_by_month": by(is_income, "Liquidation Month", "Liquidated amount"),
+        "expense_by_month": by(is_expense, "Liquidation Month", "Liquidated amount"),
+        "issued_by_day": by(is_issued, "Payment Day", "Requested Amount"),
+        "liquidated_by_method": by(is_liquidated, "Payment method", "Liquidated amount"),
+        "issued_by_method": by(is_issued, "Payment method", "Requested Amount"),
+    }
+
+# What the dashboard computed before the cube: every typed ledger row
+def row_level_figures(mirror):
+    df = type_ledger(mirror.load(SOURCE_COLUMNS))
+    df = df.assign(**{
+        "Liquidation Month": df["Liquidation date"].dt.to_period("M").astype(str),
+        "Payment Day": df["Payment date"].dt.strftime("%Y-%m-%d"),
+    })
+    return dashboard_figures(df)
+
+
+def test_cube_matches_the_row_level_dashboard(spreadsheet, mirror, journal):
+    figures = dashboard_figures(load_finance_cube())
+    assert figures == row_level_figures(mirror)
+    assert figures["total_income"] and figures["total_expense"] and figures["issued_funds"]
+
+    # A status patch moves an issued row's amount into the liquidated totals
+    rows = mirror.changed_rows(0, SOURCE_COLUMNS)
+    issued = rows.loc[rows["Liquidation status"] == TO_BE_LIQUIDATED, ROW_COLUMN].iloc[0]
+    mirror.patch_rows({int(issued): {
+        "Liquidation status": LIQUIDATED, "Liquidated amount": "-25000", "Liquidation date": "2026-07-15",
+    }})
+    patched = dashboard_figures(load_finance_cube())
+    assert patched == row_level_figures(mirror)
+    assert patched != figures
+
+    # Rows appended to the sheet reach the cube through the tail sync
+    row = dict.fromkeys(LEDGER_HEADERS, "")
+    row.update({
+        "TRX ID": "TRX-NEW", "TRX type": INCOME, "Payment method": "Cash", "Payment date": "2026-07-20",
+        "Liquidation status": LIQUIDATED, "Liquidated amount": "40000", "Liquidation date": "2026-07-20",
+    })
+    spreadsheet.sheet1.append_rows([[row[header] for header in LEDGER_HEADERS]])
+    mirror.sync(force=True)
+    appended = dashboard_figures(load_finance_cube())
+    assert appended == row_level_figures(mirror)
+    assert appended["total_income"] == patched["total_income"] + 40000
@@ -0,0 +1,231 @@
+import pytest
+
+import ledger_indexes
+import ledger_schema
+from fake_sheets import LEDGER_HEADERS, FakeSpreadsheet
+from ledger_indexes import (
+    QUEUE_COLUMNS, REQUESTER_COLUMN, STATUS_COLUMN, RequesterIndex, StatusIndex, load_queued_status,
+    load_requester_requests, load_status_queue,
+)
+from ledger_mirror import ROW_COLUMN, LedgerMirror
+from ledger_schema import APPROVED, DECLINED, FIRST_ROW, ISSUED, PENDING, normalize_labels
+from write_journal import WriteJournal
+
+REQUESTER = "requester1@example.org"
+
+
+class SheetDown:
+    def append_rows(self, rows, **kwargs):
+        raise ConnectionError("down")
+
+
+@pytest.fixture
+def spreadsheet():
+    return FakeSpreadsheet.seeded(60)
+
+
+@pytest.fixture
+def mirror(spreadsheet, tmp_path, monkeypatch):
+    mirror = LedgerMirror(str(tmp_path / "mirror.sqlite"), spreadsheet.sheet1, spreadsheet)
+    mirror.sync()
+    monkeypatch.setattr(ledger_indexes, "get_ledger_mirror", lambda: mirror)
+    monkeypatch.setattr(ledger_schema, "get_ledger_mirror", lambda: mirror)
+    return mirror
+
+
+# Counts the rows each refresh reads from the mirror
+@pytest.fixture
+def reads(mirror, monkeypatch):
+    reads = []
+    changed_rows = mirror.changed_rows
+
+    def counted(since, columns=None):
+        delta = changed_rows(since, columns)
+        reads.append(len(delta))
+        return delta
+
+    monkeypatch.setattr(mirror, "changed_rows", counted)
+    return reads
+
+
+# What a full scan of the mirror gives: rows per requester and status counts,
+# and rows per (status column, status)
+def expected_requesters(mirror):
+    rows = mirror.changed_rows(0, [REQUESTER_COLUMN, STATUS_COLUMN])
+    rows[STATUS_COLUMN] = normalize_labels(rows[STATUS_COLUMN]).astype(str)
+    return {
+        requester: (group[ROW_COLUMN].tolist(), group[STATUS_COLUMN].value_counts().sort_index().to_dict())
+        for requester, group in rows.groupby(REQUESTER_COLUMN)
+    }
+
+def expected_statuses(mirror):
+    rows = mirror.changed_rows(0, QUEUE_COLUMNS)
+    return {
+        (column, status): group[ROW_COLUMN].tolist()
+        for column in QUEUE_COLUMNS
+        for status, group in rows.groupby(normalize_labels(rows[column]).astype(str), observed=True)
+    }
+
+def requesters(index):
+    return {
+        requester: (index.rows(requester), index.status_counts(requester).to_dict())
+        for requester in index.members
+    }
+
+def statuses(index):
+    return {key: index.rows(*key) for key, rows in index.members.items() if rows}
+
+
+def append(spreadsheet, mirror, trx_id, requester, status):
+    row = dict.fromkeys(LEDGER_HEADERS, "")
+    row.update({"TRX ID": trx_id, REQUESTER_COLUMN: requester, STATUS_COLUMN: status})
+    spreadsheet.sheet1.append_rows([[row[header] for header in LEDGER_HEADERS]])
+    mirror.sync(force=True)
+
+def first_row(mirror, status):
+    rows = mirror.changed_rows(0, [REQUESTER_COLUMN, STATUS_COLUMN])
+    match = rows[(rows[REQUESTER_COLUMN] == REQUESTER) & (rows[STATUS_COLUMN] == status)]
+    return int(match[ROW_COLUMN].iloc[0])
+
+
+def test_indexes_match_a_full_scan(mirror):
+    requester_index, status_index = RequesterIndex(), StatusIndex()
+    requester_index.refresh(mirror)
+    status_index.refresh(mirror)
+    assert requesters(requester_index) == expected_requesters(mirror)
+    assert statuses(status_index) == expected_statuses(mirror)
+    assert requester_index.status_counts(REQUESTER).sum() == len(requester_index.rows(REQUESTER))
+
+
+def test_patch_moves_one_row_between_statuses(mirror, reads):
+    requester_index, status_index = RequesterIndex(), StatusIndex()
+    requester_index.refresh(mirror)
+    status_index.refresh(mirror)
+    row = first_row(mirror, PENDING)
+    before = requester_index.status_counts(REQUESTER)
+    reads.clear()
+
+    mirror.patch_rows({row: {STATUS_COLUMN: APPROVED}})
+    requester_index.refresh(mirror)
+    status_index.refresh(mirror)
+
+    # Only the patched row is read again
+    assert reads == [1, 1]
+    after = requester_index.status_counts(REQUESTER)
+    assert after.get(PENDING, 0) == before[PENDING] - 1
+    assert after[APPROVED] == before.get(APPROVED, 0) + 1
+    assert row in status_index.rows(STATUS_COLUMN, APPROVED)
+    assert row not in status_index.rows(STATUS_COLUMN, PENDING)
+    assert requesters(requester_index) == expected_requesters(mirror)
+    assert statuses(status_index) == expected_statuses(mirror)
+
+
+def test_patched_requester_moves_the_row_between_requesters(mirror):
+    index = RequesterIndex()
+    index.refresh(mirror)
+    row = index.rows(REQUESTER)[0]
+
+    mirror.patch_rows({row: {REQUESTER_COLUMN: "someone@example.org"}})
+    index.refresh(mirror)
+    assert row not in index.rows(REQUESTER)
+    assert index.rows("someone@example.org") == [row]
+    assert requesters(index) == expected_requesters(mirror)
+
+
+def test_tail_appends_are_spliced_in(spreadsheet, mirror, reads):
+    requester_index, status_index = RequesterIndex(), StatusIndex()
+    requester_index.refresh(mirror)
+    status_index.refresh(mirror)
+    reads.clear()
+
+    append(spreadsheet, mirror, "TRX-NEW1", REQUESTER, DECLINED)
+    append(spreadsheet, mirror, "TRX-NEW2", "new@example.org", PENDING)
+    requester_index.refresh(mirror)
+    status_index.refresh(mirror)
+
+    assert reads == [2, 2]
+    new_row = mirror.trx_rows()["TRX-NEW1"]
+    assert requester_index.rows(REQUESTER)[-1] == new_row
+    assert requester_index.status_counts("new@example.org").to_dict() == {PENDING: 1}
+    assert status_index.rows(STATUS_COLUMN, DECLINED)[-1] == new_row
+    assert requesters(requester_index) == expected_requesters(mirror)
+    assert statuses(status_index) == expected_statuses(mirror)
+
+
+def test_layout_change_rebuilds_the_indexes(spreadsheet, mirror):
+    requester_index, status_index = RequesterIndex(), StatusIndex()
+    requester_index.refresh(mirror)
+    status_index.refresh(mirror)
+    generation = mirror.generation()
+
+    # Deleting a row shifts every row below it, so the mirror reloads
+    spreadsheet.sheet1.delete_rows(2)
+    mirror.sync(full=True)
+    assert mirror.generation() != generation
+
+    requester_index.refresh(mirror)
+    status_index.refresh(mirror)
+    assert requester_index.generation == status_index.generation == mirror.generation()
+    assert requesters(requester_index) == expected_requesters(mirror)
+    assert statuses(status_index) == expected_statuses(mirror)
+
+
+def test_requester_requests_include_queued_rows(mirror, tmp_path, monkeypatch):
+    journal = WriteJournal(str(tmp_path / "journal.sqlite"), SheetDown(), mirror)
+    monkeypatch.setattr(ledger_schema, "get_write_journal", lambda: journal)
+    index = RequesterIndex()
+    monkeypatch.setattr(ledger_indexes, "get_requester_index", lambda: index)
+    columns = ["TRX ID", REQUESTER_COLUMN, STATUS_COLUMN]
+
+    rows, counts = load_requester_requests(REQUESTER, columns)
+    assert rows[REQUESTER_COLUMN].eq(REQUESTER).all()
+    assert len(rows) == counts.sum() == len(expected_requesters(mirror)[REQUESTER][0])
+
+    row = dict.fromkeys(LEDGER_HEADERS, "")
+    row.update({"TRX ID": "TRX-QUEUED", REQUESTER_COLUMN: REQUESTER, STATUS_COLUMN: PENDING})
+    journal.enqueue([[row[header] for header in LEDGER_HEADERS]])
+
+    queued_rows, queued_counts = load_requester_requests(REQUESTER, columns)
+    assert queued_rows["TRX ID"].iloc[-1] == "TRX-QUEUED"
+    assert len(queued_rows) == len(rows) + 1
+    assert queued_counts[PENDING] == counts.get(PENDING, 0) + 1
+
+
+def test_status_queue_follows_patches_in_every_queue_column(mirror, monkeypatch):
+    index = StatusIndex()
+    monkeypatch.setattr(ledger_indexes, "get_status_index", lambda: index)
+    approved = load_status_queue(STATUS_COLUMN, APPROVED, ["TRX ID"])
+    pending = load_status_queue(STATUS_COLUMN, PENDING, ["TRX ID"])
+    row = int(pending.index[0]) + FIRST_ROW
+
+    # Approval and payment are separate columns; each patch moves the row
+    # only within its own column's sets
+    mirror.patch_rows({row: {STATUS_COLUMN: APPROVED, "Payment status": ISSUED}})
+    moved = load_status_queue(STATUS_COLUMN, APPROVED, ["TRX ID"])
+    assert len(moved) == len(approved) + 1
+    assert pending["TRX ID"].iloc[0] in moved["TRX ID"].tolist()
+    assert (moved[STATUS_COLUMN] == APPROVED).all()
+    assert len(load_status_queue(STATUS_COLUMN, PENDING)) == len(pending) - 1
+    assert row in index.rows("Payment status", ISSUED)
+    assert statuses(index) == expected_statuses(mirror)
+
+
+def test_queued_rows_join_the_status_queue_once_appended(spreadsheet, mirror, tmp_path, monkeypatch):
+    journal = WriteJournal(str(tmp_path / "journal.sqlite"), SheetDown(), mirror)
+    monkeypatch.setattr(ledger_schema, "get_write_journal", lambda: journal)
+    index = StatusIndex()
+    monkeypatch.setattr(ledger_indexes, "get_status_index", lambda: index)
+    pending = load_status_queue(STATUS_COLUMN, PENDING, ["TRX ID"])
+
+    row = dict.fromkeys(LEDGER_HEADERS, "")
+    row.update({"TRX ID": "TRX-QUEUED", REQUESTER_COLUMN: REQUESTER, STATUS_COLUMN: PENDING})
+    journal.enqueue([[row[header] for header in LEDGER_HEADERS]])
+    assert load_queued_status(STATUS_COLUMN, PENDING, ["TRX ID"])["TRX ID"].tolist() == ["TRX-QUEUED"]
+    assert len(load_status_queue(STATUS_COLUMN, PENDING, ["TRX ID"])) == len(pending)
+
+    journal.sheet = spreadsheet.sheet1
+    journal.flush()
+    assert load_queued_status(STATUS_COLUMN, PENDING, ["TRX ID"]).empty
+    queue = load_status_queue(STATUS_COLUMN, PENDING, ["TRX ID"])
+    assert queue["TRX ID"].iloc[-1] == "TRX-QUEUED"
+    assert len(queue) == len(pending) + 1
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+import ledger_mirror
+from fake_sheets import FakeSpreadsheet
+from ledger_mirror import LedgerMirror
+
+
+@pytest.fixture
+def spreadsheet():
+    return FakeSpreadsheet.seeded(20)
+
+
+@pytest.fixture
+def mirror(spreadsheet, tmp_path):
+    mirror = LedgerMirror(str(tmp_path / "mirror.sqlite"), spreadsheet.sheet1, spreadsheet)
+    mirror.sync()
+    return mirror
+
+
+def append(spreadsheet, trx_id):
+    # The fake's modifiedTime has clock resolution
+    time.sleep(0.01)
+    width = len(spreadsheet.sheet1.row_values(1))
+    spreadsheet.sheet1.append_rows([[trx_id] + [""] * (width - 1)])
+
+
+def test_unchanged_sheet_is_not_downloaded(spreadsheet, mirror):
+    spreadsheet.reset_calls()
+    assert mirror.sync() == 0
+    assert dict(spreadsheet.calls) == {"get_lastUpdateTime": 1}
+
+
+def test_appended_rows_fetch_only_the_tail(spreadsheet, mirror):
+    append(spreadsheet, "TRX-NEW")
+    spreadsheet.reset_calls()
+    assert mirror.sync() == 1
+    assert spreadsheet.calls["get_all_values"] == 0
+    assert "TRX-NEW" in mirror.trx_rows()
+
+
+def test_skipped_reconcile_restarts_the_interval(spreadsheet, mirror, monkeypatch):
+    # Due, but the sheet is unchanged since the last reconcile
+    monkeypatch.setattr(ledger_mirror, "FULL_SYNC_INTERVAL", 0.5)
+    time.sleep(0.5)
+    spreadsheet.reset_calls()
+    assert mirror.sync() == 0
+    assert spreadsheet.calls["get_all_values"] == 0
+
+    # The next change is within a fresh interval, so only the tail is fetched
+    append(spreadsheet, "TRX-NEW")
+    spreadsheet.reset_calls()
+    assert mirror.sync() == 1
+    assert spreadsheet.calls["get_all_values"] == 0
+
+
+def test_due_reconcile_downloads_a_changed_sheet(spreadsheet, mirror, monkeypatch):
+    monkeypatch.setattr(ledger_mirror, "FULL_SYNC_INTERVAL", 0)
+    append(spreadsheet, "TRX-NEW")
+    spreadsheet.reset_calls()
+    mirror.sync()
+    assert spreadsheet.calls["get_all_values"] == 1
+    assert "TRX-NEW" in mirror.trx_rows()
+
+
+def test_forced_sync_skips_a_stale_probe(spreadsheet, mirror, monkeypatch):
+    modified = spreadsheet.get_lastUpdateTime()
+    monkeypatch.setattr(spreadsheet, "get_lastUpdateTime", lambda: modified)
+    append(spreadsheet, "TRX-NEW")
+    assert mirror.sync() == 0
+    spreadsheet.reset_calls()
+    assert mirror.sync(force=True) == 1
+    assert "get_lastUpdateTime" not in spreadsheet.calls
+    assert "TRX-NEW" in mirror.trx_rows()
+
+
+def test_reconcile_keeps_rows_patched_during_the_download(spreadsheet, mirror, monkeypatch):
+    get_all_values = spreadsheet.sheet1.get_all_values
+    column = spreadsheet.sheet1.row_values(1).index("Approval Status") + 1
+
+    # The app writes a status while the full download is in flight; the
+    # downloaded values predate it
+    def download_then_patch(*args, **kwargs):
+        values = get_all_values(*args, **kwargs)
+        spreadsheet.sheet1.update_cell(5, column, "Patched")
+        mirror.patch_rows({5: {"Approval Status": "Patched"}})
+        return values
+    monkeypatch.setattr(spreadsheet.sheet1, "get_all_values", download_then_patch)
+    append(spreadsheet, "TRX-NEW")
+    mirror.sync(full=True)
+
+    status = mirror.rows_at([5], ["Approval Status"])["Approval Status"].tolist()
+    assert status == ["Patched"]
+    assert "TRX-NEW" in mirror.trx_rows()
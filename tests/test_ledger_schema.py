@@ -0,0 +1,47 @@
+import logging
+
+import pandas as pd
+
+from ledger_schema import APPROVED, TO_BE_LIQUIDATED, normalize_labels, parse_amounts, parse_dates, type_ledger
+
+
+def test_known_labels_take_their_canonical_spelling():
+    labels = normalize_labels(pd.Series(["approved ", "APPROVED", " Approved", "to  be LIQUIDATED"]))
+    assert labels.tolist() == [APPROVED, APPROVED, APPROVED, TO_BE_LIQUIDATED]
+    assert labels.dtype == "category"
+
+
+def test_other_labels_keep_the_sheet_spelling():
+    labels = normalize_labels(pd.Series(["Pending Payment", " On hold ", "ON HOLD", ""]))
+    assert labels.tolist() == ["Pending Payment", "On hold", "ON HOLD", ""]
+
+
+def test_dates_in_the_app_formats_are_parsed():
+    dates = parse_dates(pd.Series(["2026-06-01 10:30:00", "2026-06-02", " 2026-06-03 ", ""]))
+    assert dates.tolist()[:3] == [
+        pd.Timestamp("2026-06-01 10:30:00"), pd.Timestamp("2026-06-02"), pd.Timestamp("2026-06-03"),
+    ]
+    assert pd.isna(dates.iloc[3])
+
+
+def test_other_date_formats_are_blank_and_logged(caplog):
+    with caplog.at_level(logging.WARNING, logger="ledger_schema"):
+        dates = parse_dates(pd.Series(["03/04/2026", "4 June 2026", "2026-06-01"], name="Payment date"))
+    assert dates.isna().tolist() == [True, True, False]
+    assert "2 Payment date value(s)" in caplog.text
+
+
+def test_amounts_are_whole_iqd():
+    amounts = parse_amounts(pd.Series(["1,500", "-2000", "12.6", "", "n/a", 300]))
+    assert amounts.tolist() == [1500, -2000, 13, 0, 0, 300]
+    assert amounts.dtype == "int64"
+
+
+def test_type_ledger_converts_declared_columns_only():
+    raw = pd.DataFrame({
+        "TRX ID": ["TRX-0001"], "Requested Amount": ["-5,000"], "Approval date": ["2026-06-01 09:00:00"],
+        "Approval Status": ["approved"], "Purpose": ["  kept as is  "],
+    })
+    typed = type_ledger(raw)
+    assert typed.iloc[0].tolist() == ["TRX-0001", -5000, pd.Timestamp("2026-06-01 09:00:00"), APPROVED, "  kept as is  "]
+    assert raw["Requested Amount"].tolist() == ["-5,000"]
@@ -0,0 +1,68 @@
+import pytest
+
+import ledger_transitions
+from fake_sheets import FakeSpreadsheet
+from ledger_mirror import LedgerMirror
+from ledger_transitions import apply_transitions
+
+
+@pytest.fixture
+def spreadsheet(tmp_path, monkeypatch):
+    spreadsheet = FakeSpreadsheet.seeded(20)
+    mirror = LedgerMirror(str(tmp_path / "mirror.sqlite"), spreadsheet.sheet1, spreadsheet)
+    mirror.sync(full=True)
+    monkeypatch.setattr(ledger_transitions, "get_ledger_mirror", lambda: mirror)
+    monkeypatch.setattr(ledger_transitions, "get_ledger_sheet", lambda: spreadsheet.sheet1)
+    spreadsheet.reset_calls()
+    return spreadsheet
+
+
+def status(spreadsheet, trx_id):
+    values = spreadsheet.sheet1.get_all_values()
+    column = values[0].index("Approval Status")
+    return next(row[column] for row in values[1:] if row[0] == trx_id)
+
+
+def test_known_rows_are_written_without_a_sync(spreadsheet):
+    assert apply_transitions({"TRX-0003": {"Approval Status": "Approved"}}) == []
+    assert spreadsheet.calls["get_all_values"] == 0
+    assert status(spreadsheet, "TRX-0003") == "Approved"
+
+
+def test_unknown_id_fetches_only_the_tail(spreadsheet):
+    missing = apply_transitions({"TRX-0003": {"Approval Status": "Approved"}, "TRX-NONE": {"Approval Status": "Approved"}})
+    assert missing == ["TRX-NONE"]
+    assert spreadsheet.calls["get_all_values"] == 0
+    assert status(spreadsheet, "TRX-0003") == "Approved"
+
+
+def test_only_unknown_ids_never_download_the_sheet(spreadsheet):
+    assert apply_transitions({"TRX-NONE": {"Approval Status": "Approved"}}) == ["TRX-NONE"]
+    assert spreadsheet.calls["get_all_values"] == 0
+    assert spreadsheet.calls["batch_update"] == 0
+
+
+def test_appended_row_is_found_after_a_tail_sync(spreadsheet):
+    width = len(spreadsheet.sheet1.get_all_values()[0])
+    spreadsheet.sheet1.append_rows([["TRX-NEW"] + [""] * (width - 1)])
+    spreadsheet.reset_calls()
+    assert apply_transitions({"TRX-NEW": {"Approval Status": "Approved"}}) == []
+    assert spreadsheet.calls["get_all_values"] == 0
+    assert status(spreadsheet, "TRX-NEW") == "Approved"
+
+
+def test_moved_rows_reconcile_the_mirror_once(spreadsheet):
+    spreadsheet.sheet1.delete_rows(2)
+    spreadsheet.reset_calls()
+    assert apply_transitions({"TRX-0005": {"Approval Status": "Approved"}, "TRX-NONE": {"Approval Status": "Approved"}}) == ["TRX-NONE"]
+    assert spreadsheet.calls["get_all_values"] == 1
+    assert status(spreadsheet, "TRX-0005") == "Approved"
+
+
+def test_appended_row_is_found_while_the_probe_lags(spreadsheet, monkeypatch):
+    modified = spreadsheet.get_lastUpdateTime()
+    monkeypatch.setattr(spreadsheet, "get_lastUpdateTime", lambda: modified)
+    width = len(spreadsheet.sheet1.get_all_values()[0])
+    spreadsheet.sheet1.append_rows([["TRX-NEW"] + [""] * (width - 1)])
+    assert apply_transitions({"TRX-NEW": {"Approval Status": "Approved"}}) == []
+    assert status(spreadsheet, "TRX-NEW") == "Approved"
@@ -0,0 +1,153 @@
+import threading
+
+import pytest
+from gspread.exceptions import APIError
+from requests.exceptions import ConnectionError
+
+import sheets_scheduler
+from fake_sheets import FakeClient, FakeSpreadsheet, _FakeResponse
+from sheets_metrics import InstrumentedClient, SheetsMetrics
+from sheets_scheduler import SheetsScheduler
+
+
+def api_error(code):
+    return APIError(_FakeResponse(code, "injected", "INJECTED"))
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(sheets_scheduler, "MAX_BACKOFF", 0)
+
+
+@pytest.fixture
+def spreadsheet():
+    return FakeSpreadsheet.seeded(5)
+
+
+@pytest.fixture
+def worksheet(spreadsheet):
+    client = InstrumentedClient(FakeClient(spreadsheet), SheetsMetrics(log_path=""), SheetsScheduler(1000, 1000))
+    return client.open_by_url("").sheet1
+
+
+# Make spreadsheet.sheet1.<name> fail `times` times. applied: the call
+# reaches the sheet before it fails, as when only the response is lost.
+def fail(spreadsheet, monkeypatch, name, error, times=1, applied=False):
+    target = spreadsheet.sheet1
+    method = getattr(target, name)
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(args)
+        if len(calls) > times:
+            return method(*args, **kwargs)
+        if applied:
+            method(*args, **kwargs)
+        raise error
+    monkeypatch.setattr(target, name, flaky)
+    return calls
+
+
+def trx_ids(spreadsheet):
+    return [row[0] for row in spreadsheet.sheet1.get_all_values()[1:]]
+
+
+def test_append_is_not_retried_after_a_server_error(spreadsheet, worksheet, monkeypatch):
+    calls = fail(spreadsheet, monkeypatch, "append_rows", api_error(503), applied=True)
+    with pytest.raises(APIError):
+        worksheet.append_rows([["TRX-NEW"]])
+    assert len(calls) == 1
+    assert trx_ids(spreadsheet).count("TRX-NEW") == 1
+
+
+def test_append_is_not_retried_after_a_network_error(spreadsheet, worksheet, monkeypatch):
+    calls = fail(spreadsheet, monkeypatch, "append_row", ConnectionError("reset"), applied=True)
+    with pytest.raises(ConnectionError):
+        worksheet.append_row(["TRX-NEW"])
+    assert len(calls) == 1
+    assert trx_ids(spreadsheet).count("TRX-NEW") == 1
+
+
+def test_delete_is_not_retried_after_a_server_error(spreadsheet, worksheet, monkeypatch):
+    before = trx_ids(spreadsheet)
+    calls = fail(spreadsheet, monkeypatch, "delete_rows", api_error(500), applied=True)
+    with pytest.raises(APIError):
+        worksheet.delete_rows(2)
+    assert len(calls) == 1
+    assert trx_ids(spreadsheet) == before[1:]
+
+
+def test_append_is_retried_after_a_rate_limit(spreadsheet, worksheet, monkeypatch):
+    calls = fail(spreadsheet, monkeypatch, "append_rows", api_error(429), times=2)
+    worksheet.append_rows([["TRX-NEW"]])
+    assert len(calls) == 3
+    assert trx_ids(spreadsheet).count("TRX-NEW") == 1
+
+
+def test_reads_are_retried_after_a_server_error(spreadsheet, worksheet, monkeypatch):
+    calls = fail(spreadsheet, monkeypatch, "get", api_error(503), times=2)
+    assert worksheet.get("A1") == [["TRX ID"]]
+    assert len(calls) == 3
+
+
+def test_cell_writes_are_retried_after_a_network_error(spreadsheet, worksheet, monkeypatch):
+    calls = fail(spreadsheet, monkeypatch, "batch_update", ConnectionError("reset"), applied=True)
+    worksheet.update_cell(2, 1, "TRX-EDITED")
+    assert len(calls) == 2
+    assert trx_ids(spreadsheet)[0] == "TRX-EDITED"
+
+
+def test_client_errors_are_not_retried(spreadsheet, worksheet, monkeypatch):
+    calls = fail(spreadsheet, monkeypatch, "get", api_error(400))
+    with pytest.raises(APIError):
+        worksheet.get("A1")
+    assert len(calls) == 1
+
+
+def test_retries_stop_after_max_retries(spreadsheet, worksheet, monkeypatch):
+    monkeypatch.setattr(sheets_scheduler, "MAX_RETRIES", 2)
+    calls = fail(spreadsheet, monkeypatch, "get", api_error(503), times=10)
+    with pytest.raises(APIError):
+        worksheet.get("A1")
+    assert len(calls) == 3
+
+
+def write_in_thread(worksheet, row, value):
+    outcome = {}
+
+    def write():
+        try:
+            worksheet.update_cell(row, 1, value)
+            outcome["ok"] = True
+        except BaseException as e:
+            outcome["error"] = e
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive(), "write is stuck behind a failed flusher"
+    return outcome
+
+
+def test_failed_merge_does_not_block_later_writes(spreadsheet, worksheet, monkeypatch):
+    def broken(batches):
+        raise ValueError("bad payload")
+    monkeypatch.setattr(sheets_scheduler, "merge_cell_updates", broken)
+    assert isinstance(write_in_thread(worksheet, 2, "TRX-FIRST")["error"], ValueError)
+
+    monkeypatch.undo()
+    assert write_in_thread(worksheet, 2, "TRX-EDITED") == {"ok": True}
+    assert trx_ids(spreadsheet)[0] == "TRX-EDITED"
+
+
+def test_interrupted_flusher_does_not_block_later_writes(spreadsheet, worksheet, monkeypatch):
+    scheduler = worksheet._scheduler
+    acquire = scheduler.limiters["write"].acquire
+
+    def interrupted():
+        raise KeyboardInterrupt()
+    monkeypatch.setattr(scheduler.limiters["write"], "acquire", interrupted)
+    assert isinstance(write_in_thread(worksheet, 2, "TRX-FIRST")["error"], KeyboardInterrupt)
+
+    monkeypatch.setattr(scheduler.limiters["write"], "acquire", acquire)
+    assert write_in_thread(worksheet, 2, "TRX-EDITED") == {"ok": True}
+    assert trx_ids(spreadsheet)[0] == "TRX-EDITED"
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from fake_sheets import FakeSpreadsheet
+from ledger_mirror import LedgerMirror
+from trx_ids import TrxSequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def mirror_path(tmp_path):
+    spreadsheet = FakeSpreadsheet.seeded(20)
+    path = str(tmp_path / "mirror.sqlite")
+    LedgerMirror(path, spreadsheet.sheet1, spreadsheet).sync()
+    return path
+
+
+@pytest.fixture
+def sequence_path(tmp_path):
+    return str(tmp_path / "sequence.sqlite")
+
+
+def numbers(trx_ids):
+    return sorted(int(trx_id.split("-")[1]) for trx_id in trx_ids)
+
+
+def test_ids_continue_after_the_sheet(mirror_path, sequence_path):
+    sequence = TrxSequence(sequence_path, LedgerMirror(mirror_path, None))
+    assert sequence.allocate(3) == ["TRX-0021", "TRX-0022", "TRX-0023"]
+    assert sequence.allocate() == ["TRX-0024"]
+
+
+def test_concurrent_sessions_get_unique_contiguous_ids(mirror_path, sequence_path):
+    mirror = LedgerMirror(mirror_path, None)
+    shared = TrxSequence(sequence_path, mirror)
+    allocated = []
+
+    # Sessions of one process share a sequence; other processes have their own
+    def allocate(sequence):
+        for _ in range(25):
+            allocated.extend(sequence.allocate(2))
+    sequences = [shared] * 4 + [TrxSequence(sequence_path, mirror) for _ in range(4)]
+    threads = [threading.Thread(target=allocate, args=(sequence,)) for sequence in sequences]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert numbers(allocated) == list(range(21, 21 + 8 * 25 * 2))
+
+
+def test_concurrent_processes_get_unique_contiguous_ids(mirror_path, sequence_path, tmp_path):
+    script = (
+        "import sys\n"
+        "from ledger_mirror import LedgerMirror\n"
+        "from trx_ids import TrxSequence\n"
+        "sequence = TrxSequence(sys.argv[1], LedgerMirror(sys.argv[2], None))\n"
+        "print(' '.join(trx_id for _ in range(20) for trx_id in sequence.allocate(3)))\n"
+    )
+    environment = dict(os.environ, PYTHONPATH=ROOT, FINANCE_CACHE_DIR=str(tmp_path))
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", script, sequence_path, mirror_path], stdout=subprocess.PIPE, text=True, env=environment
+        )
+        for _ in range(4)
+    ]
+    allocated = []
+    for process in processes:
+        output, _ = process.communicate(timeout=120)
+        assert process.returncode == 0
+        allocated.extend(output.split())
+
+    assert numbers(allocated) == list(range(21, 21 + 4 * 20 * 3))
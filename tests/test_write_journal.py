@@ -0,0 +1,208 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import write_journal
+from fake_sheets import FakeSpreadsheet
+from ledger_mirror import LedgerMirror
+from write_journal import DONE, INFLIGHT, PENDING, WriteJournal
+
+
+class Crash(BaseException):
+    pass
+
+
+@pytest.fixture
+def spreadsheet():
+    return FakeSpreadsheet.seeded(10)
+
+
+@pytest.fixture
+def mirror(spreadsheet, tmp_path):
+    mirror = LedgerMirror(str(tmp_path / "mirror.sqlite"), spreadsheet.sheet1, spreadsheet)
+    mirror.sync()
+    return mirror
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "journal.sqlite")
+
+
+@pytest.fixture
+def journal(spreadsheet, mirror, journal_path):
+    return WriteJournal(journal_path, spreadsheet.sheet1, mirror)
+
+
+def dead_owner():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return f"{process.pid}:dead"
+
+
+def row(spreadsheet, trx_id):
+    return [trx_id] + ["x"] * (len(spreadsheet.sheet1.row_values(1)) - 1)
+
+
+def sheet_ids(spreadsheet):
+    return [values[0] for values in spreadsheet.sheet1.get_all_values()[1:]]
+
+
+def statuses(journal):
+    return dict(journal._conn.execute("SELECT trx_id, status FROM journal").fetchall())
+
+
+def test_flush_appends_each_row_once(spreadsheet, journal):
+    journal.enqueue([row(spreadsheet, "TRX-A"), row(spreadsheet, "TRX-B")])
+    assert journal.backlog() == 2
+    journal.flush()
+    journal.flush()
+    assert sheet_ids(spreadsheet)[-2:] == ["TRX-A", "TRX-B"]
+    assert spreadsheet.calls["append_rows"] == 1
+    assert journal.backlog() == 0
+    assert "TRX-A" in journal.mirror.trx_rows()
+
+
+def test_lost_response_is_not_appended_again(spreadsheet, journal, monkeypatch):
+    append_rows = spreadsheet.sheet1.append_rows
+
+    def lost(rows, **kwargs):
+        append_rows(rows, **kwargs)
+        raise ConnectionError("response lost")
+    monkeypatch.setattr(spreadsheet.sheet1, "append_rows", lost)
+
+    journal.enqueue([row(spreadsheet, "TRX-A")])
+    with pytest.raises(ConnectionError):
+        journal.flush()
+    assert statuses(journal) == {"TRX-A": DONE}
+
+    monkeypatch.setattr(spreadsheet.sheet1, "append_rows", append_rows)
+    journal.flush()
+    assert sheet_ids(spreadsheet).count("TRX-A") == 1
+
+
+def test_failure_before_the_sheet_leaves_rows_pending(spreadsheet, journal, monkeypatch):
+    append_rows = spreadsheet.sheet1.append_rows
+
+    def down(rows, **kwargs):
+        raise ConnectionError("down")
+    monkeypatch.setattr(spreadsheet.sheet1, "append_rows", down)
+
+    journal.enqueue([row(spreadsheet, "TRX-A")])
+    with pytest.raises(ConnectionError):
+        journal.flush()
+    assert statuses(journal) == {"TRX-A": PENDING}
+    assert journal.backlog() == 1
+
+    monkeypatch.setattr(spreadsheet.sheet1, "append_rows", append_rows)
+    journal.flush()
+    assert sheet_ids(spreadsheet).count("TRX-A") == 1
+    assert journal.backlog() == 0
+
+
+def test_crash_after_append_is_recovered_once(spreadsheet, mirror, journal_path, monkeypatch):
+    crashed = WriteJournal(journal_path, spreadsheet.sheet1, mirror)
+    crashed.owner = dead_owner()
+    crashed.enqueue([row(spreadsheet, "TRX-A")])
+
+    # The process dies between append_rows and recording the result
+    def crash(seqs, sheet_row):
+        raise Crash()
+    monkeypatch.setattr(crashed, "_finish", crash)
+    with pytest.raises(Crash):
+        crashed.flush()
+    assert statuses(crashed) == {"TRX-A": INFLIGHT}
+
+    restarted = WriteJournal(journal_path, spreadsheet.sheet1, mirror)
+    restarted.enqueue([row(spreadsheet, "TRX-B")])
+    restarted.flush()
+    assert sheet_ids(spreadsheet)[-2:] == ["TRX-A", "TRX-B"]
+    assert statuses(restarted) == {"TRX-A": DONE, "TRX-B": DONE}
+
+
+def test_crash_before_append_is_retried(spreadsheet, mirror, journal_path):
+    crashed = WriteJournal(journal_path, spreadsheet.sheet1, mirror)
+    crashed.owner = dead_owner()
+    crashed.enqueue([row(spreadsheet, "TRX-A")])
+    assert crashed._claim()
+
+    restarted = WriteJournal(journal_path, spreadsheet.sheet1, mirror)
+    restarted.flush()
+    assert sheet_ids(spreadsheet).count("TRX-A") == 1
+    assert restarted.backlog() == 0
+
+
+def test_live_process_batch_is_left_alone(spreadsheet, mirror, journal_path, monkeypatch):
+    other = WriteJournal(journal_path, spreadsheet.sheet1, mirror)
+    other.owner = f"{os.getppid()}:other"
+    other.enqueue([row(spreadsheet, "TRX-A")])
+    assert other._claim()
+
+    journal = WriteJournal(journal_path, spreadsheet.sheet1, mirror)
+    journal.enqueue([row(spreadsheet, "TRX-B")])
+    journal.flush()
+    # Only one batch is inflight at a time, so nothing was sent meanwhile
+    assert spreadsheet.calls["append_rows"] == 0
+    assert statuses(journal) == {"TRX-A": INFLIGHT, "TRX-B": PENDING}
+
+    # Claimed too long ago: abandoned even though the process lives
+    monkeypatch.setattr(write_journal, "INFLIGHT_TIMEOUT", -1)
+    journal.flush()
+    assert sheet_ids(spreadsheet)[-2:] == ["TRX-A", "TRX-B"]
+    assert journal.backlog() == 0
+
+
+def test_lost_response_is_found_while_the_probe_lags(spreadsheet, journal, monkeypatch):
+    # Drive's modifiedTime has not caught up with the append
+    modified = spreadsheet.get_lastUpdateTime()
+    monkeypatch.setattr(spreadsheet, "get_lastUpdateTime", lambda: modified)
+    append_rows = spreadsheet.sheet1.append_rows
+
+    def lost(rows, **kwargs):
+        append_rows(rows, **kwargs)
+        raise ConnectionError("response lost")
+    monkeypatch.setattr(spreadsheet.sheet1, "append_rows", lost)
+
+    journal.enqueue([row(spreadsheet, "TRX-A")])
+    with pytest.raises(ConnectionError):
+        journal.flush()
+    monkeypatch.setattr(spreadsheet.sheet1, "append_rows", append_rows)
+    journal.flush()
+    assert sheet_ids(spreadsheet).count("TRX-A") == 1
+    assert statuses(journal) == {"TRX-A": DONE}
+
+
+def test_slow_append_keeps_its_claim(spreadsheet, mirror, journal_path, monkeypatch):
+    monkeypatch.setattr(write_journal, "HEARTBEAT_INTERVAL", 0.05)
+    monkeypatch.setattr(write_journal, "INFLIGHT_TIMEOUT", 0.3)
+    append_rows = spreadsheet.sheet1.append_rows
+    sending, release = threading.Event(), threading.Event()
+
+    # The first append is still retrying well past INFLIGHT_TIMEOUT
+    def slow(rows, **kwargs):
+        if not sending.is_set():
+            sending.set()
+            release.wait(5)
+        return append_rows(rows, **kwargs)
+    monkeypatch.setattr(spreadsheet.sheet1, "append_rows", slow)
+
+    first = WriteJournal(journal_path, spreadsheet.sheet1, mirror)
+    second = WriteJournal(journal_path, spreadsheet.sheet1, mirror)
+    first.enqueue([row(spreadsheet, "TRX-A")])
+    flusher = threading.Thread(target=first.flush)
+    flusher.start()
+    assert sending.wait(5)
+
+    time.sleep(0.5)
+    second.flush()
+    assert statuses(second) == {"TRX-A": INFLIGHT}
+
+    release.set()
+    flusher.join()
+    second.flush()
+    assert sheet_ids(spreadsheet).count("TRX-A") == 1
+    assert statuses(second) == {"TRX-A": DONE}
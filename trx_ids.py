@@ -0,0 +1,60 @@
+import os
+import re
+import threading
+
+import streamlit as st
+
+from app_config import CACHE_DIR
+from ledger_mirror import Transaction, get_ledger_mirror, open_database
+
+# Persistent TRX ID counter shared by every server process using CACHE_DIR
+SEQUENCE_PATH = os.path.join(CACHE_DIR, "trx_sequence.sqlite")
+TRX_ID_PATTERN = re.compile(r"^TRX-(\d+)$")
+
+def format_trx_id(number):
+    return f"TRX-{number:04d}"
+
+
+# TRX ID counter in a SQLite file. The counter is advanced inside an
+# exclusive transaction, so concurrent sessions and processes never receive
+# the same ID, and it never falls behind the IDs already in the sheet.
+class TrxSequence:
+    def __init__(self, path, mirror):
+        self.mirror = mirror
+        self._lock = threading.RLock()
+        self._sheet_max = (None, 0)  # (mirror layout version, highest TRX number)
+
+        self._conn = open_database(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sequence (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    # Highest TRX number already in the sheet, per the mirror's TRX ID index
+    def _sheet_max_number(self):
+        layout_version = self.mirror.layout_version()
+        cached_version, number = self._sheet_max
+        if cached_version != layout_version:
+            numbers = [int(match.group(1)) for match in map(TRX_ID_PATTERN.match, self.mirror.trx_rows()) if match]
+            number = max(numbers, default=0)
+            self._sheet_max = (layout_version, number)
+        return number
+
+    # Reserve a contiguous block of TRX IDs
+    def allocate(self, count=1):
+        sheet_max = self._sheet_max_number()
+        with Transaction(self._conn, self._lock) as conn:
+            row = conn.execute("SELECT value FROM sequence WHERE name = 'trx'").fetchone()
+            start = max(row[0] if row else 0, sheet_max) + 1
+            conn.execute("INSERT OR REPLACE INTO sequence (name, value) VALUES ('trx', ?)", (start + count - 1,))
+        return [format_trx_id(number) for number in range(start, start + count)]
+
+
+@st.cache_resource
+def get_trx_sequence():
+    return TrxSequence(SEQUENCE_PATH, get_ledger_mirror())
+
+# Reserve a contiguous block of TRX IDs
+def allocate_trx_ids(count=1):
+    return get_trx_sequence().allocate(count)
+
+# Generate the next TRX ID
+def next_trx_id():
+    return allocate_trx_ids(1)[0]
@@ -0,0 +1,34 @@
+import streamlit as st
+from sheets_client import get_users_sheet
+
+# Safety net for accounts edited directly in the Users sheet
+USER_DIRECTORY_TTL = 600
+
+def normalize_email(email):
+    return str(email).strip().lower()
+
+
+# Users tab held in memory and indexed by normalized email
+class UserDirectory:
+    def __init__(self, records):
+        self.records = records
+        self.by_email = {}
+        for record in records:
+            self.by_email.setdefault(normalize_email(record.get("Email", "")), record)
+
+    def find(self, email):
+        return self.by_email.get(normalize_email(email))
+
+
+# One directory per process, shared by every session
+@st.cache_resource(ttl=USER_DIRECTORY_TTL)
+def get_user_directory():
+    return UserDirectory(get_users_sheet().get_all_records())
+
+# Look up a user record by email, or None
+def find_user(email):
+    return get_user_directory().find(email)
+
+# Reload the directory on next use, after users are added or deleted
+def invalidate_user_directory():
+    get_user_directory.clear()
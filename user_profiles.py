@@ -1,56 +1,66 @@
-import gspread
 import streamlit as st
 import pandas as pd
 import hashlib
-from google.oauth2.service_account import Credentials
-import plotly.express as px
-
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
-
-# Load credentials from Streamlit secrets
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
+from sheets_client import get_users_sheet
+from user_directory import get_user_directory, invalidate_user_directory
 
 # Hash password function
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
-# Fetch user data
-@st.cache_data(ttl=300)
+# Fetch user data from the shared user directory
 def fetch_user_data():
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).worksheet("Users")
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
-        return df
+        return pd.DataFrame(get_user_directory().records)
     except Exception as e:
         st.error(f"Error fetching user data: {e}")
         return pd.DataFrame()
 
+# Sheet row of the user with this email (case-insensitive), or None
+def find_user_row(sheet, email):
+    records = sheet.get_all_records()
+    for idx, record in enumerate(records, start=2):  # Skip header row
+        if str(record["Email"]).strip().lower() == email.strip().lower():
+            return idx
+    return None
+
 # Delete a user from the sheet
 def delete_user(email):
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).worksheet("Users")
-        records = sheet.get_all_records()
-
-        # Ensure email case insensitivity and whitespace stripping
-        for idx, record in enumerate(records, start=2):  # Skip header row
-            if record["Email"].strip().lower() == email.strip().lower():
-                sheet.delete_rows(idx)
-                st.success("User deleted successfully!")
-                st.rerun()  # Use the correct rerun function
-                return
-        
-        st.warning("User not found.")
+        sheet = get_users_sheet()
+        idx = find_user_row(sheet, email)
+        if idx is None:
+            st.warning("User not found.")
+            return
+
+        try:
+            sheet.delete_rows(idx)
+        except Exception:
+            # Deletes are not retried on server or network errors, as the
+            # row may be gone already; only a user still listed is an error
+            if find_user_row(sheet, email) is not None:
+                raise
+        invalidate_user_directory()
+        st.success("User deleted successfully!")
+        st.rerun()  # Use the correct rerun function
     except Exception as e:
         st.error(f"Error deleting user: {e}")
 
+# Add a user to the sheet; returns False if the email is already taken
+def add_user(name, email, phone_number, password, role):
+    sheet = get_users_sheet()
+    if find_user_row(sheet, email) is not None:
+        return False
+    try:
+        sheet.append_row([name, email, phone_number, hash_password(password), role])
+    except Exception:
+        # Appends are not retried on server or network errors, as the row
+        # may have been written; it only failed if the user is not there
+        if find_user_row(sheet, email) is None:
+            raise
+    invalidate_user_directory()
+    return True
+
 # Render the User Profiles Page
 def render_user_profiles():
 
@@ -83,6 +93,7 @@ def render_user_profiles():
             st.markdown(f"<div class='user-count'>{role_counts.get('Requester', 0)}</div>", unsafe_allow_html=True)
 
         # User data visualization
+        import plotly.express as px  # Deferred: only needed once there is data to chart
         role_chart = px.pie(df, names="Role", title="User Role Distribution", hole=0.4)
         st.plotly_chart(role_chart, use_container_width=True)
 
@@ -115,11 +126,13 @@ def render_user_profiles():
 
         if st.button("Add User"):
             if name and email and phone_number and password and role:
-                hashed_password = hash_password(password)
-                client = load_credentials()
-                sheet = client.open_by_url(GOOGLE_SHEET_URL).worksheet("Users")
-                sheet.append_row([name, email, phone_number, hashed_password, role])
-                st.success(f"User {name} added successfully with role {role}.")
+                try:
+                    if add_user(name, email, phone_number, password, role):
+                        st.success(f"User {name} added successfully with role {role}.")
+                    else:
+                        st.warning(f"A user with the email {email} already exists.")
+                except Exception as e:
+                    st.error(f"Error adding user: {e}")
             else:
                 st.warning("Please fill in all required fields.")
 
@@ -1,32 +1,23 @@
 import streamlit as st
-import gspread
 import pandas as pd
-from google.oauth2.service_account import Credentials
+from ledger_indexes import load_requester_requests
+from ledger_schema import APPROVED, PENDING
 
-# Google Sheets setup
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1hZqFmgpMNr4JSTIwBL18MIPwL4eNjq-FAw7-eQ8NiIE/edit#gid=0"
+# Ledger columns this page reads
+LEDGER_COLUMNS = [
+    "TRX ID", "Requester name", "Project name", "Requested Amount",
+    "Approval Status", "Payment status", "Liquidation status",
+]
 
-# Load credentials from Streamlit secrets
-def load_credentials():
-    key_data = st.secrets["GOOGLE_CREDENTIALS"]
-    scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = Credentials.from_service_account_info(key_data, scopes=scopes)
-    return gspread.authorize(credentials)
-
-# Fetch user's past requests
-@st.cache_data(ttl=60)
+# Fetch user's past requests and their count per approval status. Both come
+# from the requester index shared by all users, so only the user's own rows
+# are read rather than filtering the whole ledger.
 def fetch_user_requests(email):
     try:
-        client = load_credentials()
-        sheet = client.open_by_url(GOOGLE_SHEET_URL).sheet1
-        data = sheet.get_all_records()
-
-        df = pd.DataFrame(data)
-        user_requests = df[df["Requester name"] == email]
-        return user_requests
+        return load_requester_requests(email, LEDGER_COLUMNS)
     except Exception as e:
         st.error(f"Error fetching requests: {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(), pd.Series(dtype="int64")
 
 # Render the View Requests Page with Enhanced UI
 def render_user_requests():
@@ -74,24 +65,25 @@ def render_user_requests():
 
     # Fetching user's data
     user_email = st.session_state.get("user_email", "Unknown")
-    requests_df = fetch_user_requests(user_email)
+    requests_df, status_counts = fetch_user_requests(user_email)
 
     # Filter options
     st.markdown("<div class='card'>", unsafe_allow_html=True)
-    status_filter = st.selectbox("Filter by Request Status:", ["All"] + requests_df["Approval Status"].unique().tolist())
+    status_filter = st.selectbox("Filter by Request Status:", ["All"] + status_counts.index.astype(str).tolist())
     st.markdown("</div>", unsafe_allow_html=True)
 
     if not requests_df.empty:
         # Apply filters if selected
         if status_filter != "All":
             requests_df = requests_df[requests_df["Approval Status"] == status_filter]
+            status_counts = status_counts[status_counts.index == status_filter]
 
         # Display request count summary
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         col1, col2, col3 = st.columns(3)
-        col1.metric("Total Requests", len(requests_df))
-        col2.metric("Approved", len(requests_df[requests_df["Approval Status"] == "Approved"]))
-        col3.metric("Pending", len(requests_df[requests_df["Approval Status"] == "Pending"]))
+        col1.metric("Total Requests", int(status_counts.sum()))
+        col2.metric("Approved", int(status_counts.get(APPROVED, 0)))
+        col3.metric("Pending", int(status_counts.get(PENDING, 0)))
         st.markdown("</div>", unsafe_allow_html=True)
 
         # Display requests in a styled dataframe
@@ -0,0 +1,25 @@
+import streamlit as st
+
+# Pending items shown per page
+PAGE_SIZE = 20
+
+# Render the pager of a work queue and return only the visible items, oldest
+# first. Pages create widgets for this slice only, so a rerun costs the same
+# however long the queue grows.
+def work_queue_page(items, key, sort_by=None, page_size=PAGE_SIZE):
+    if sort_by in items:
+        items = items.sort_values(sort_by, kind="stable", na_position="last")
+
+    total = len(items)
+    page_count = max(1, -(-total // page_size))
+    page_key = f"{key}_page"
+    # Stay inside the range when processed items shrink the queue
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+
+    col1, col2 = st.columns([1, 3])
+    page = col1.number_input("Page", min_value=1, max_value=page_count, step=1, key=page_key)
+    start = (page - 1) * page_size
+    col2.caption(f"Showing {start + 1:,}-{min(start + page_size, total):,} of {total:,} pending, oldest first")
+
+    return items.iloc[start:start + page_size]
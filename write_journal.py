@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+from app_config import CACHE_DIR
+from ledger_mirror import TRX_ID_COLUMN, Transaction, get_ledger_mirror, open_database, record_append
+from sheets_client import get_ledger_sheet
+
+# Rows accepted by the app but not yet confirmed in the transactions sheet
+JOURNAL_PATH = os.path.join(CACHE_DIR, "write_journal.sqlite")
+
+# Flusher timing: idle poll, wait after a failed flush, rows per append_rows
+FLUSH_INTERVAL = 2
+RETRY_INTERVAL = 30
+BATCH_SIZE = 500
+# The claim on an inflight batch is renewed this often while its append runs;
+# one not renewed for INFLIGHT_TIMEOUT was abandoned, even if its process lives
+HEARTBEAT_INTERVAL = 10
+INFLIGHT_TIMEOUT = 300
+# Written entries are kept this long for auditing
+RETENTION = 7 * 24 * 3600
+
+PENDING = "pending"
+INFLIGHT = "inflight"
+DONE = "done"
+
+logger = logging.getLogger(__name__)
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Durable write-behind queue for appends to the transactions sheet.
+#
+# Rows are committed to a local SQLite journal and appended to the sheet by a
+# background flusher in journal order, in batched append_rows calls. A batch
+# is marked inflight before it is sent; if the outcome is unknown (a failed
+# call, or a crash before the result was recorded) its TRX IDs are looked up
+# in the sheet, so each row is appended exactly once, also across restarts.
+# Only one batch is inflight at a time, across every process sharing CACHE_DIR.
+class WriteJournal:
+    def __init__(self, path, sheet, mirror):
+        self.path = path
+        self.sheet = sheet
+        self.mirror = mirror
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+        self._conn = open_database(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS journal ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, trx_id TEXT NOT NULL, row TEXT NOT NULL, "
+            "status TEXT NOT NULL, owner TEXT, claimed_at REAL, created_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, sheet_row INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS journal_status ON journal (status, seq)")
+
+    def _transaction(self):
+        return Transaction(self._conn, self._lock)
+
+    def _trx_id_index(self):
+        headers = self.mirror.headers()
+        return headers.index(TRX_ID_COLUMN) if TRX_ID_COLUMN in headers else 0
+
+    # Journal rows for appending; returns once they are durable locally
+    def enqueue(self, rows):
+        if not rows:
+            return
+        trx_id_index = self._trx_id_index()
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO journal (trx_id, row, status, created_at) VALUES (?, ?, ?, ?)",
+                ((str(row[trx_id_index]), json.dumps(list(row), default=str), PENDING, now) for row in rows),
+            )
+        self._wakeup.set()
+
+    # Rows not yet confirmed in the sheet
+    def backlog(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM journal WHERE status != ?", (DONE,)
+            ).fetchone()[0]
+
+    # Changes whenever rows are journaled or confirmed; part of the cache key
+    # of views that show unflushed rows
+    def state(self):
+        with self._lock:
+            return tuple(self._conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(seq), 0) FROM journal WHERE status != ?", (DONE,)
+            ).fetchone())
+
+    # Rows not yet confirmed in the sheet, oldest first
+    def pending_rows(self):
+        with self._lock:
+            entries = self._conn.execute(
+                "SELECT row FROM journal WHERE status != ? ORDER BY seq", (DONE,)
+            ).fetchall()
+        return [json.loads(row) for row, in entries]
+
+    # Append everything pending, batch by batch. Raises if the sheet could
+    # not be written; the rows stay journaled and are retried later.
+    def flush(self):
+        with self._flush_lock:
+            self._recover()
+            while True:
+                batch = self._claim()
+                if not batch:
+                    return
+                seqs = [seq for seq, _ in batch]
+                rows = [row for _, row in batch]
+                try:
+                    response = self._append(seqs, rows)
+                except Exception as e:
+                    self._record_error(seqs, e)
+                    self._recover()
+                    raise
+                sheet_row = record_append(response, rows, self.mirror)
+                self._finish(seqs, sheet_row)
+
+    # append_rows for a claimed batch. Retries through rate limits can take
+    # minutes, so the claim is kept fresh meanwhile and no other process
+    # takes the batch over while this call may still write it.
+    def _append(self, seqs, rows):
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(seqs, done), name="write-journal-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        try:
+            return self.sheet.append_rows(rows)
+        finally:
+            done.set()
+            heartbeat.join()
+
+    def _heartbeat(self, seqs, done):
+        while not done.wait(HEARTBEAT_INTERVAL):
+            try:
+                with self._transaction() as conn:
+                    conn.executemany(
+                        "UPDATE journal SET claimed_at = ? WHERE seq = ? AND status = ? AND owner = ?",
+                        ((time.time(), seq, INFLIGHT, self.owner) for seq in seqs),
+                    )
+            except Exception:
+                logger.exception("Could not renew the write journal claim")
+
+    # Take the oldest pending rows, unless another batch is still inflight
+    def _claim(self):
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM journal WHERE status = ? LIMIT 1", (INFLIGHT,)).fetchone():
+                return []
+            entries = conn.execute(
+                "SELECT seq, row FROM journal WHERE status = ? ORDER BY seq LIMIT ?", (PENDING, BATCH_SIZE)
+            ).fetchall()
+            if entries:
+                conn.executemany(
+                    "UPDATE journal SET status = ?, owner = ?, claimed_at = ?, attempts = attempts + 1 WHERE seq = ?",
+                    ((INFLIGHT, self.owner, time.time(), seq) for seq, _ in entries),
+                )
+        return [(seq, json.loads(row)) for seq, row in entries]
+
+    def _finish(self, seqs, sheet_row):
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE journal SET status = ?, sheet_row = ?, error = NULL WHERE seq = ?",
+                ((DONE, sheet_row + i if sheet_row else None, seq) for i, seq in enumerate(seqs)),
+            )
+            conn.execute("DELETE FROM journal WHERE status = ? AND created_at < ?", (DONE, time.time() - RETENTION))
+
+    def _record_error(self, seqs, error):
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE journal SET error = ? WHERE seq = ?", ((f"{type(error).__name__}: {error}", seq) for seq in seqs)
+            )
+
+    # Settle inflight batches whose outcome is unknown: this process's own
+    # failed batch, or one left by a process that died or stalled. Rows whose
+    # TRX ID is in the sheet are done; the rest go back to pending.
+    def _recover(self):
+        with self._lock:
+            inflight = self._conn.execute(
+                "SELECT seq, trx_id, owner, claimed_at FROM journal WHERE status = ? ORDER BY seq", (INFLIGHT,)
+            ).fetchall()
+        now = time.time()
+        abandoned = [
+            (seq, trx_id, owner, claimed_at) for seq, trx_id, owner, claimed_at in inflight
+            if owner == self.owner
+            or not _process_alive(int(owner.split(":")[0]))
+            or now - claimed_at > INFLIGHT_TIMEOUT
+        ]
+        if not abandoned:
+            return
+
+        # Pull rows appended since the last sync, then look the IDs up. The
+        # probe may not reflect the lost append yet, so it is skipped.
+        self.mirror.sync(force=True)
+        in_sheet = self.mirror.trx_rows()
+        with self._transaction() as conn:
+            for seq, trx_id, owner, claimed_at in abandoned:
+                status = DONE if trx_id in in_sheet else PENDING
+                conn.execute(
+                    "UPDATE journal SET status = ?, sheet_row = ? WHERE seq = ? AND status = ? AND owner = ? AND claimed_at = ?",
+                    (status, in_sheet.get(trx_id), seq, INFLIGHT, owner, claimed_at),
+                )
+
+    def start_flusher(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._flush_loop, name="write-journal-flush", daemon=True)
+        self._thread.start()
+
+    def _flush_loop(self):
+        delay = FLUSH_INTERVAL
+        while True:
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                delay = FLUSH_INTERVAL
+            except Exception:
+                logger.exception("Write journal flush failed; retrying in %ss", RETRY_INTERVAL)
+                delay = RETRY_INTERVAL
+
+
+# Process-wide journal; the flusher starts with it and resumes any rows a
+# previous run left behind
+@st.cache_resource
+def get_write_journal():
+    journal = WriteJournal(JOURNAL_PATH, get_ledger_sheet(), get_ledger_mirror())
+    journal.start_flusher()
+    return journal
+
+# Queue rows for the transactions sheet and return immediately
+def journal_rows(rows):
+    get_write_journal().enqueue(rows)